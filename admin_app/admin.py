@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import sys
+import importlib
 import logging
 
 # --- PyQt6 Imports ---
 try:
     from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox
     from PyQt6.QtCore import QTimer, Qt
-    # QtGui elements like QColor, QFont, QAction are used by managers/ui_setup
+    from PyQt6.QtGui import QTextCursor
+    # Other QtGui elements like QColor, QFont, QAction are used by managers/ui_setup
 except ImportError:
     print("ERROR: PyQt6 is not installed. Please run 'pip install PyQt6'", file=sys.stderr)
     sys.exit(1)
@@ -25,16 +27,37 @@ from admin_app.gui_managers.backend_manager import BackendManager
 
 from admin_app.app_logic.app_state import AppState
 from admin_app.utils.gui_logging import setup_gui_logging  # Import specific items
+from admin_app.workers.callable_task import CallableTask, start_task
 
 # --- Backend Module Imports ---
 try:
-    from backend import admin_connect, policy_engine, service_mapper, alias_manager, nlp
+    from backend import admin_connect, service_mapper, alias_manager
 except ImportError as e:
     print(f"ERROR: Failed to import backend module: {e}", file=sys.stderr)
     # In a real app, might show a QMessageBox if QApplication is available
     sys.exit(1)
+# policy_engine/nlp pull in spaCy (multi-second cold start); imported by AdminGUI._late_imports
 
 
+# Reconciliation interval adapts to churn: halved on change, doubled when idle, within these bounds (ms)
+STATUS_INTERVAL_MIN_MS = 5000
+STATUS_INTERVAL_MAX_MS = 30000
+
+
+def _import_and_warm_nlp():
+    """
+    Runs on a pool thread: imports policy_engine (and with it nlp/spaCy), then runs the pipeline
+    once so the first preview is as fast as later ones. Warm-up happens here, before Preview is
+    enabled, so no parse can use the (not thread-safe) spaCy pipeline concurrently.
+    Returns the warm-up error message, or None.
+    """
+    module = importlib.import_module("backend.policy_engine")  # Also imports backend.nlp
+    try:
+        module.nlp.warmup()
+    except Exception as e:  # A failed warm-up only costs first-parse latency
+        return str(e)
+    return None
+
 # Store original stdout/stderr for restoration
 original_stdout = sys.stdout
 original_stderr = sys.stderr
@@ -44,7 +67,7 @@ class AdminGUI(QMainWindow):
     def __init__(self):
         super().__init__()
 
-        if not all([admin_connect, policy_engine, service_mapper, nlp, alias_manager]):
+        if not all([admin_connect, service_mapper, alias_manager]):
             QMessageBox.critical(None, "Import Error", "One or more backend modules failed to load. Cannot start GUI.")
             sys.exit("Backend module import failed")
 
@@ -57,64 +80,164 @@ class AdminGUI(QMainWindow):
         # 2. Initialize Application State
         self.app_state = AppState()
 
+        # Auto-scroll of the log view is throttled: at most one scroll per 50 ms, however many appends
+        self._log_scroll_timer = QTimer(self)
+        self._log_scroll_timer.setSingleShot(True)
+        self._log_scroll_timer.setInterval(50)
+        # noinspection PyUnresolvedReferences
+        self._log_scroll_timer.timeout.connect(self._scroll_log_to_end)
+        # noinspection PyUnresolvedReferences
+        self.ui.log_view.textChanged.connect(self._schedule_log_scroll)
+
         # 3. Setup Logging (needs log_view from ui)
-        # The setup_gui_logging function now also redirects stdout/stderr
-        self.stdout_redirector, self.stderr_redirector, self.qt_log_handler = \
-            setup_gui_logging(self.append_log_message)
+        # The setup_gui_logging function now also redirects stdout/stderr (into the same buffer)
+        self.stdout_redirector, self.stderr_redirector, self.qt_log_handler, self.log_listener = \
+            setup_gui_logging()
 
         self.append_log_message("[GUI] Admin Controller starting...") # Initial log
 
+        # Log records are buffered by the handler and flushed to the view in batches
+        self._log_timer = QTimer(self)
+        # noinspection PyUnresolvedReferences
+        self._log_timer.timeout.connect(self._drain_log_buffer)
+        self._log_timer.start(50)
+
         # 4. Initialize Managers (pass ui, app_state, and necessary callbacks/modules)
-        self.backend_manager = BackendManager(self.ui, self.app_state, self.append_log_message)
+        self.backend_manager = BackendManager(self.ui, self.app_state, self.append_log_message,
+                                              self._on_backend_state_changed)
         self.device_table_manager = DeviceTableManager(self.ui, self.app_state, self.append_log_message, self) # self for parent window
         self.policy_manager = PolicyManager(self.ui, self.app_state, self.append_log_message, self) # self for parent window
 
 
-        # 5. Initialize Status Timer
+        # 5. Initialize Device Status Timers (only run while the backend is up, see _on_backend_state_changed)
+        # Connect/disconnect events pushed by the backend are applied every 200 ms (cheap when idle).
+        self.device_event_timer = QTimer(self)
+        self.device_event_timer.setInterval(200)
+        # noinspection PyUnresolvedReferences
+        self.device_event_timer.timeout.connect(self.device_table_manager.process_device_events)
+
+        # Slow full reconciliation as a safety net; it also checks app_state.is_backend_running internally.
         self.status_timer = QTimer(self)
         # noinspection PyUnresolvedReferences
-        self.status_timer.timeout.connect(self.device_table_manager.update_device_status)
-        self.status_timer.setInterval(5000) # 5 seconds
-        # Start timer only if backend starts successfully (handled by backend_manager, or here)
-        # For now, let backend_manager control this if needed, or we can start it after successful backend start.
-        # Let's start it if backend is running (which is initially false).
-        # It will be more robust if the timer start/stop is tied to backend_manager's success/failure.
-        # Let's assume for now the device_table_manager.update_device_status will check app_state.is_backend_running.
-        self.status_timer.start() # Start it, it will check backend status internally.
+        self.status_timer.timeout.connect(self._on_status_tick)
+        self.status_timer.setInterval(STATUS_INTERVAL_MIN_MS)
 
 
         # 6. Initialize Service Mapper (early check)
-        self._init_service_mapper()
+        # Loaded on a pool thread once the event loop runs, so reading services.json doesn't delay the first paint.
+        # Preview stays disabled until then so a parse can't race the loader.
+        self._mapper_ready = False
+        self.ui.preview_btn.setEnabled(False)
+        QTimer.singleShot(0, self._init_service_mapper)
+
+        # 7. Import the NLP stack after the window is up (Preview is also gated on it)
+        self._nlp_ready = False
+        QTimer.singleShot(0, self._late_imports)
 
         self.append_log_message("[GUI] Initialization complete.")
 
 
+    def _on_backend_state_changed(self, running: bool):
+        if running:
+            self.device_table_manager.reset_server_down()
+            self.status_timer.setInterval(STATUS_INTERVAL_MIN_MS)
+            self.device_event_timer.start()
+            self.status_timer.start()
+        else:
+            self.device_event_timer.stop()
+            self.status_timer.stop()
+            # Apply pending events, then mark remaining devices as server down, once
+            self.device_table_manager.process_device_events()
+            self.device_table_manager.mark_all_server_down()
+
+    def _on_status_tick(self):
+        changed = self.device_table_manager.update_device_status()
+        interval = self.status_timer.interval()
+        if changed:
+            self.status_timer.setInterval(max(STATUS_INTERVAL_MIN_MS, interval // 2))
+        else:
+            self.status_timer.setInterval(min(STATUS_INTERVAL_MAX_MS, interval * 2))
+
     def _init_service_mapper(self):
-        if not service_mapper: return
+        if not service_mapper or self._is_closing: return
         self.append_log_message("[GUI] Initializing service mappings...")
-        try:
-            # Call a function that might log success/failure internally
-            _ = service_mapper.get_service_params("ssh") # Example call
-            # The service_mapper itself logs success/failure.
-            self.append_log_message("[GUI] Service mappings initialization attempt complete (check logs for details).")
-        except Exception as e:
-            self.append_log_message(f"[GUI CRITICAL] Failed during service mapper init call: {e}")
-            logging.exception("Service mapper init failed in GUI") # Log full traceback
-            QMessageBox.critical(self, "Config Error", f"Failed to initialize service mapper:\n{e}")
-
+        # Call a function that might log success/failure internally; the first call loads the JSON file
+        start_task(CallableTask(service_mapper.get_service_params, "ssh"),
+                   finished=self._on_mapper_loaded, failed=self._on_mapper_failed)
+
+    def _on_mapper_loaded(self, _result):
+        # The service_mapper itself logs success/failure.
+        self.append_log_message("[GUI] Service mappings initialization attempt complete (check logs for details).")
+        self._set_mapper_ready()
+
+    def _on_mapper_failed(self, error: str):
+        self.append_log_message(f"[GUI CRITICAL] Failed during service mapper init call: {error}")
+        self._set_mapper_ready()  # Preview still works for rules that don't need service mappings
+        QMessageBox.critical(self, "Config Error", f"Failed to initialize service mapper:\n{error}")
+
+    def _set_mapper_ready(self):
+        self._mapper_ready = True
+        self._update_preview_enabled()
+
+    def _late_imports(self):
+        if self._is_closing: return
+        self.append_log_message("[GUI] Loading NLP...")
+        start_task(CallableTask(_import_and_warm_nlp),
+                   finished=self._on_nlp_imported, failed=self._on_nlp_import_failed)
+
+    def _on_nlp_imported(self, warmup_error):
+        if warmup_error:
+            self.append_log_message(f"[GUI WARN] NLP warm-up failed: {warmup_error}")
+        self.append_log_message("[GUI] NLP loaded.")
+        # Only now, with warm-up finished, may a preview run the pipeline
+        self._nlp_ready = True
+        self._update_preview_enabled()
+
+    def _on_nlp_import_failed(self, error: str):
+        self.append_log_message(f"[GUI CRITICAL] Failed to load the NLP modules: {error}")
+        QMessageBox.critical(self, "Import Error", f"Failed to load the NLP modules; preview is unavailable:\n{error}")
+
+    def _update_preview_enabled(self):
+        if not self._is_closing:
+            self.ui.preview_btn.setEnabled(self._mapper_ready and self._nlp_ready)
+
+
+    def _drain_log_buffer(self):
+        batch = self.qt_log_handler.drain()
+        if batch:
+            self._write_log_view("\n".join(batch))
+
+    def _schedule_log_scroll(self):
+        if not self._log_scroll_timer.isActive():
+            self._log_scroll_timer.start()
+
+    def _scroll_log_to_end(self):
+        if not self._is_closing:
+            self.ui.log_view.moveCursor(QTextCursor.MoveOperation.End)
 
     def append_log_message(self, message: str):
+        """Queues a GUI log line; it is written with the next batch drained by _log_timer."""
+        if self._is_closing:
+            return
+        self.qt_log_handler.append_line(message.strip())
+
+    def _write_log_view(self, text: str):
         if self._is_closing or not hasattr(self.ui, 'log_view'): # Check if log_view exists
             return
         try:
-            self.ui.log_view.append(message.strip())
-            self.ui.log_view.verticalScrollBar().setValue(self.ui.log_view.verticalScrollBar().maximum())
+            self.ui.log_view.appendPlainText(text)  # Scrolling is left to _log_scroll_timer
         except RuntimeError: # Window might be closing
             pass
         except Exception as e:
             # Use original stderr if logging fails during critical shutdown
-            print(f"LOGGING ERROR: {e}\nOriginal message: {message}", file=original_stderr)
+            print(f"LOGGING ERROR: {e}\nOriginal message: {text}", file=original_stderr)
+
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Reconciliation ticks are skipped while hidden/minimized; catch up as soon as the window is shown
+        if hasattr(self, 'device_table_manager') and not self._is_closing:
+            self.device_table_manager.update_device_status()
 
     def closeEvent(self, event):
         if self._is_closing:
@@ -126,12 +249,19 @@ class AdminGUI(QMainWindow):
         self.append_log_message("[GUI] Close event. Shutting down...")
 
         self.status_timer.stop()
-        self.append_log_message("[GUI] Status timer stopped.")
+        self.device_event_timer.stop()
+        self.append_log_message("[GUI] Status timers stopped.")
+        self._log_timer.stop()
+        self._log_scroll_timer.stop()
+
+        self.policy_manager.shutdown()
 
         # Signal backend to stop via its manager
         if self.backend_manager:
             self.backend_manager.cleanup_on_close() # Manager handles thread join
 
+        self.log_listener.stop()  # Flushes queued records and joins the listener thread
+
         # Restore stdout/stderr
         sys.stdout = original_stdout
         sys.stderr = original_stderr
@@ -153,7 +283,7 @@ if __name__ == "__main__":
     else:
         app = QApplication.instance()
 
-    if not all([admin_connect, policy_engine, service_mapper, nlp, alias_manager]):
+    if not all([admin_connect, service_mapper, alias_manager]):
         # This check is also in AdminGUI.__init__, but good for early exit if modules are missing
         # before even trying to create the window.
         logging.critical("Essential backend modules failed to load. Exiting application.")
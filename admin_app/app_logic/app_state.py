@@ -1,39 +1,48 @@
-from datetime import datetime
+import sys
+from dataclasses import dataclass, field
 
-class AppState:
-    def __init__(self):
-        self._previewed_commands: list[tuple[str, str | None, str | None, list[str]]] = []
-        self._selected_target_ip_display: str | None = None
-        self._selected_target_actual_ip: str | None = None
-        self.devices_status: dict[str, dict] = {} # ip: {'status': str, 'last_seen': datetime}
-        self.is_backend_running: bool = False # New: to track backend status more directly
-
-    @property
-    def previewed_commands(self):
-        return self._previewed_commands
+from backend import admin_connect
 
-    @previewed_commands.setter
-    def previewed_commands(self, value):
-        self._previewed_commands = value
+@dataclass(slots=True)
+class AppState:
+    # Previewed rules as parallel lists (one entry per rule) instead of a list of tuples
+    preview_target_ips: list[str] = field(default_factory=list)
+    preview_source_ips: list[str | None] = field(default_factory=list)
+    preview_dest_ips: list[str | None] = field(default_factory=list)
+    preview_cmd_lists: list[list[str]] = field(default_factory=list)
+    preview_total_commands: int = 0  # Computed once at preview time
+    selected_target_ip_display: str | None = None
+    selected_target_actual_ip: str | None = None
+    devices_status: dict[str, dict] = field(default_factory=dict) # ip: {'status': str, 'last_seen': int (time.time_ns())}
+    is_backend_running: bool = False # New: to track backend status more directly
 
     @property
-    def selected_target_ip_display(self):
-        return self._selected_target_ip_display
-
-    @selected_target_ip_display.setter
-    def selected_target_ip_display(self, value):
-        self._selected_target_ip_display = value
+    def has_previewed_commands(self) -> bool:
+        return bool(self.preview_target_ips)
 
-    @property
-    def selected_target_actual_ip(self):
-        return self._selected_target_actual_ip
+    def set_previewed_commands(self, generated_tuples: list[tuple[str, str | None, str | None, list[str]]]):
+        """Stores (target_ip, source_ip, dest_ip, cmd_list) tuples from the policy engine column-wise."""
+        if not generated_tuples:
+            self.clear_preview_data()
+            return
+        (self.preview_target_ips, self.preview_source_ips,
+         self.preview_dest_ips, self.preview_cmd_lists) = map(list, zip(*generated_tuples))
+        # Parsed IPs are fresh strings; interned they match the backend's (interned) IPs by identity
+        self.preview_target_ips = [sys.intern(ip) for ip in self.preview_target_ips]
+        self.preview_total_commands = sum(map(len, self.preview_cmd_lists))
 
-    @selected_target_actual_ip.setter
-    def selected_target_actual_ip(self, value):
-        self._selected_target_actual_ip = value
+    @staticmethod
+    def get_connected_snapshot() -> frozenset[str]:
+        """Returns the backend's connected IPs; a lock-free read of the snapshot it publishes."""
+        return getattr(admin_connect, "connected_devices_snapshot", frozenset())
 
-    def update_device_status_entry(self, ip: str, status: str, last_seen: datetime):
-        self.devices_status[ip] = {'status': status, 'last_seen': last_seen}
+    def update_device_status_entry(self, ip: str, status: str, last_seen: int):
+        entry = self.devices_status.get(ip)
+        if entry is None:
+            self.devices_status[ip] = {'status': status, 'last_seen': last_seen}
+        else:  # Mutate in place; no new dict per device per tick
+            entry['status'] = status
+            entry['last_seen'] = last_seen
 
     def get_device_status_entry(self, ip: str):
         return self.devices_status.get(ip)
@@ -46,8 +55,12 @@ class AppState:
         self.devices_status.clear()
 
     def clear_preview_data(self):
-        self._previewed_commands = []
+        self.preview_target_ips = []
+        self.preview_source_ips = []
+        self.preview_dest_ips = []
+        self.preview_cmd_lists = []
+        self.preview_total_commands = 0
 
     def clear_selection_data(self):
-        self._selected_target_ip_display = None
-        self._selected_target_actual_ip = None
\ No newline at end of file
+        self.selected_target_ip_display = None
+        self.selected_target_actual_ip = None
\ No newline at end of file
@@ -1,7 +1,7 @@
 import threading
-import time
 import logging
 from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import QTimer
 
 # Assuming admin_connect is in the parent directory or Python path
 from backend import admin_connect
@@ -11,10 +11,11 @@ from backend import admin_connect
 log = logging.getLogger(__name__)
 
 class BackendManager:
-    def __init__(self, ui, app_state, append_log_slot):
+    def __init__(self, ui, app_state, append_log_slot, backend_state_slot=None):
         self.ui = ui # Instance of Ui_AdminMainWindow
         self.app_state = app_state # Instance of AppState
         self.append_log = append_log_slot # Method to append to log_view
+        self.backend_state_changed = backend_state_slot # Called with True/False when the backend starts/stops
         self.worker_thread = None
 
         self.ui.start_btn.clicked.connect(self.start_backend)
@@ -34,12 +35,20 @@ class BackendManager:
             admin_connect.stop_event.clear()
             self.worker_thread = threading.Thread(target=admin_connect.main, name="AdminConnectBackend", daemon=True)
             self.worker_thread.start()
-            time.sleep(0.2) # Give thread a moment to start
+            # Give thread a moment to start, without blocking the event loop
+            QTimer.singleShot(200, self._finalize_backend_start)
+        except Exception as e:
+            self._on_backend_start_error(e)
 
+    def _finalize_backend_start(self):
+        try:
+            if self.worker_thread is None:
+                return # Stopped again before the check ran
             if self.worker_thread.is_alive():
                 self.append_log("[GUI] Backend thread started successfully.")
                 self.ui.stop_btn.setEnabled(True)
                 self.app_state.is_backend_running = True
+                if self.backend_state_changed: self.backend_state_changed(True)
             else:
                 self.append_log("[GUI ERROR] Backend thread failed to start. Check logs.")
                 self.ui.start_btn.setEnabled(True)
@@ -47,11 +56,14 @@ class BackendManager:
                 self.app_state.is_backend_running = False
                 QMessageBox.critical(self.ui.central_widget, "Backend Error", "Failed to start backend. Check logs.")
         except Exception as e:
-            self.append_log(f"[GUI CRITICAL] Failed to start backend: {e}")
-            log.exception("GUI start backend failed")
-            self.ui.start_btn.setEnabled(True)
-            self.app_state.is_backend_running = False
-            QMessageBox.critical(self.ui.central_widget, "Backend Error", f"Error starting backend:\n{e}")
+            self._on_backend_start_error(e)
+
+    def _on_backend_start_error(self, e: Exception):
+        self.append_log(f"[GUI CRITICAL] Failed to start backend: {e}")
+        log.exception("GUI start backend failed")
+        self.ui.start_btn.setEnabled(True)
+        self.app_state.is_backend_running = False
+        QMessageBox.critical(self.ui.central_widget, "Backend Error", f"Error starting backend:\n{e}")
 
     def stop_backend(self):
         if not admin_connect:
@@ -67,7 +79,7 @@ class BackendManager:
         self.append_log("[GUI] Sending stop signal to backend...")
         self.ui.stop_btn.setEnabled(False)
         try:
-            admin_connect.stop_event.set()
+            admin_connect.request_stop()
             # Wait a bit for the thread to potentially join (optional, but good practice)
             # self.worker_thread.join(timeout=2.0) # If join is desired here.
             # if self.worker_thread.is_alive():
@@ -81,6 +93,7 @@ class BackendManager:
             self.ui.start_btn.setEnabled(True)
             self.app_state.is_backend_running = False
             # The device table manager will handle updating device statuses based on app_state.is_backend_running
+            if self.backend_state_changed: self.backend_state_changed(False)
 
     def get_worker_thread_status(self):
         return self.worker_thread and self.worker_thread.is_alive()
@@ -88,7 +101,7 @@ class BackendManager:
     def cleanup_on_close(self):
         if self.app_state.is_backend_running and admin_connect:
             self.append_log("[GUI Close] Signaling backend to stop from BackendManager...")
-            admin_connect.stop_event.set()
+            admin_connect.request_stop()
             if self.worker_thread:
                 self.worker_thread.join(timeout=2.0) # Attempt to join
                 if self.worker_thread.is_alive():
@@ -1,14 +1,19 @@
 import logging
-from datetime import datetime
-from PyQt6.QtWidgets import QTableWidgetItem, QMenu, QMessageBox
-from PyQt6.QtGui import QColor, QAction
+import queue
+import time
+from PyQt6.QtCore import QSignalBlocker
+from PyQt6.QtWidgets import QMenu, QMessageBox
+from PyQt6.QtGui import QAction
 
 # Assuming these are in parent directory or Python path
 from backend import admin_connect, alias_manager
 from admin_app.gui_setup.dialogs import AliasDialog  # Relative import for AliasDialog
+from admin_app.gui_setup.device_table_model import IP_ROLE, ALIAS_ROLE
 
 log = logging.getLogger(__name__)
 
+BULK_UPDATE_THRESHOLD = 5  # More changed rows than this are applied as one model reset
+
 
 class DeviceTableManager:
     def __init__(self, ui, app_state, append_log_slot, parent_window):
@@ -16,119 +21,214 @@ class DeviceTableManager:
         self.app_state = app_state  # Instance of AppState
         self.append_log = append_log_slot
         self.parent_window = parent_window  # The AdminGUI instance for dialog parent
+        self.model = self.ui.device_model  # DeviceTableModel behind the device table view
+        # Bumped on status transitions and alias edits; refresh_device_table is a no-op while they match
+        self._dirty_epoch = 0
+        self._rendered_epoch = -1
+        self._aliases_dirty = False  # Set by alias edits; the model's alias cache is only dropped then
+        # Backend snapshot object the last reconciliation ran against (admin_connect re-binds it on every change)
+        self._reconciled_snapshot = None
+        # IPs whose app_state entry is currently 'Connected'; reconciliation diffs against it with set algebra
+        self._shown_connected: set[str] = set()
+        self._server_down_applied = False  # Set once the server-down state has been applied for this stop
+
+        # Context menu built once; show_device_context_menu only retargets the actions via setData
+        self._context_menu = QMenu(self.parent_window)  # Parent the menu to the main window
+        self._alias_action = QAction("Assign/Edit Alias...", self.parent_window)
+        # noinspection PyUnresolvedReferences
+        self._alias_action.triggered.connect(self._on_alias_action)
+        self._context_menu.addAction(self._alias_action)
+        self._remove_alias_action = QAction("Remove Alias", self.parent_window)
+        # noinspection PyUnresolvedReferences
+        self._remove_alias_action.triggered.connect(self._on_remove_alias_action)
+        self._context_menu.addAction(self._remove_alias_action)
 
         self.ui.device_table.customContextMenuRequested.connect(self.show_device_context_menu)
-        self.ui.device_table.itemSelectionChanged.connect(self.update_selected_target_from_table)
+        self.ui.device_table.selectionModel().selectionChanged.connect(self.update_selected_target_from_table)
 
-    def update_device_status(self):
-        if not admin_connect or not hasattr(admin_connect, 'devices_lock'):
+    def process_device_events(self):
+        """Applies connect/disconnect events queued by the backend; no lock and no scan of all devices."""
+        if not admin_connect or not hasattr(admin_connect, 'device_events'):
+            return
+        events = admin_connect.device_events
+        if events.empty():
             return
 
+        now_ns = time.time_ns()  # Formatted lazily by the model, only for rows that get painted
+        changed_ips = []
+        while True:
+            try:
+                event, ip = events.get_nowait()
+            except queue.Empty:
+                break
+            if event == admin_connect.DEVICE_CONNECTED:
+                self.app_state.update_device_status_entry(ip, 'Connected', now_ns)
+                self._shown_connected.add(ip)
+            else:
+                if ip not in self._shown_connected:
+                    continue
+                self.app_state.update_device_status_entry(ip, 'Disconnected', now_ns)  # Last seen on drop
+                self._shown_connected.discard(ip)
+            changed_ips.append(ip)
+
+        if changed_ips:
+            self._sync_rows(changed_ips)
+            self._dirty_epoch += 1
+        self.refresh_device_table()
+
+    def mark_all_server_down(self) -> bool:
+        """
+        Marks every device shown as connected as 'Disconnected (Server Down)'.
+        Applied once per backend stop; returns True if any device changed status.
+        """
+        now_ns = time.time_ns()  # Connected until the server went down: that is when they were last seen
+        changed_to_disconnected = list(self._shown_connected)
+        for ip in changed_to_disconnected:
+            self.app_state.update_device_status_entry(ip, 'Disconnected (Server Down)', now_ns)
+        self._shown_connected.clear()
+        self._reconciled_snapshot = None  # Statuses no longer reflect any snapshot
+        self._server_down_applied = True
+        if changed_to_disconnected:
+            self._sync_rows(changed_to_disconnected)
+            self._dirty_epoch += 1
+        self.refresh_device_table()
+        return bool(changed_to_disconnected)
+
+    def reset_server_down(self):
+        """Called when the backend (re)starts so the next stop is applied again."""
+        self._server_down_applied = False
+
+    def update_device_status(self) -> bool:
+        """
+        Full reconciliation against the backend's connected set (safety net for the event path).
+        Returns True if any device changed status.
+        """
+        if not admin_connect:
+            return False
+        if not self.parent_window.isVisible() or self.parent_window.isMinimized():
+            return False  # Nobody sees the table; AdminGUI.showEvent reconciles once the window is back
+
         if not self.app_state.is_backend_running:  # Check global backend status
-            # If backend is not running, mark all connected devices as disconnected
-            changed_to_disconnected = False
-            for ip in list(self.app_state.devices_status.keys()):
-                if self.app_state.devices_status[ip]['status'] == 'Connected':
-                    self.app_state.devices_status[ip]['status'] = 'Disconnected (Server Down)'
-                    changed_to_disconnected = True
-            if changed_to_disconnected:
-                self.refresh_device_table()
-            return
+            if self._server_down_applied:
+                return False  # Already marked once; nothing can change until the backend restarts
+            return self.mark_all_server_down()
 
-        now = datetime.now()
-        current_connected_ips = set()
+        now_ns = time.time_ns()  # One timestamp per tick, shared by all rows
         try:
-            # Use a short timeout to avoid blocking GUI if lock is contended
-            if admin_connect.devices_lock.acquire(timeout=0.05):
-                try:
-                    if hasattr(admin_connect, 'connected_devices'):
-                        current_connected_ips = admin_connect.connected_devices.copy()
-                finally:
-                    admin_connect.devices_lock.release()
-            else:
-                self.append_log("[GUI WARN] DeviceTable: Failed to acquire device lock for status update.")
-                # Don't return; proceed to mark devices as disconnected if they were previously connected
-                # This handles cases where the lock is stuck but devices might have dropped.
+            current_connected_ips = self.app_state.get_connected_snapshot()
         except Exception as e:
             self.append_log(f"[GUI ERROR] DeviceTable: Error getting device list: {e}")
+            return False
+        if current_connected_ips is self._reconciled_snapshot:
+            return False  # Same object: no connect/disconnect since the last reconciliation, nothing to diff
+
+        # Set differences run in C; only the (usually empty) deltas are walked in Python
+        newly_up = current_connected_ips - self._shown_connected
+        newly_down = self._shown_connected - current_connected_ips
+        for ip in newly_up:
+            self.app_state.update_device_status_entry(ip, 'Connected', now_ns)
+        for ip in newly_down:
+            self.app_state.update_device_status_entry(ip, 'Disconnected', now_ns)  # Seen up to this reconciliation
+        self._shown_connected = set(current_connected_ips)
+        changed_ips = [*newly_up, *newly_down]
+
+        self._reconciled_snapshot = current_connected_ips
+        if changed_ips:
+            self._sync_rows(changed_ips)
+            self._dirty_epoch += 1
+        self.refresh_device_table()
+        return bool(changed_ips)
+
+    def _sync_rows(self, ips):
+        """
+        Pushes the current app_state entries of `ips` into the table model.
+        Only these rows are touched; an IP without an entry anymore is removed from the table.
+        Larger batches (initial populate, server going down) rebuild the model in one reset instead.
+        """
+        if len(ips) > BULK_UPDATE_THRESHOLD:
+            self._reset_rows()
             return
+        try:
+            for ip in ips:
+                data = self.app_state.get_device_status_entry(ip)
+                if data:
+                    self.model.set_device(ip, data['status'], data['last_seen'])
+                else:
+                    self.model.remove_device(ip)
+        except Exception as e:
+            self.append_log(f"[GUI ERROR] DeviceTable: Failed to update rows: {e}")
+            log.exception("Device table row update error")
 
-        changed = False
-        # Update connected devices
-        for ip in current_connected_ips:
-            if ip not in self.app_state.devices_status or self.app_state.devices_status[ip]['status'] != 'Connected':
-                changed = True
-            self.app_state.update_device_status_entry(ip, 'Connected', now)
-
-        # Mark devices no longer in current_connected_ips as Disconnected
-        for ip in list(self.app_state.devices_status.keys()):
-            if ip not in current_connected_ips and self.app_state.devices_status[ip]['status'] == 'Connected':
-                self.app_state.update_device_status_entry(ip, 'Disconnected', self.app_state.devices_status[ip][
-                    'last_seen'])  # Keep last seen time
-                changed = True
-
-        if changed:
-            self.refresh_device_table()
+    def _reset_rows(self):
+        """Rebuilds the whole model from app_state with view updates suspended."""
+        self.ui.begin_device_update()
+        try:
+            # The reset drops the selection; refresh_device_table restores it
+            self.model.reset_devices((ip, data['status'], data['last_seen'])
+                                     for ip, data in self.app_state.devices_status.items())
+        except Exception as e:
+            self.append_log(f"[GUI ERROR] DeviceTable: Failed to rebuild rows: {e}")
+            log.exception("Device table reset error")
+        finally:
+            self.ui.end_device_update()
+        self._rendered_epoch = -1  # Force the selection restore on the next refresh
+
+    def mark_dirty(self):
+        """Forces the next refresh_device_table call to re-render, re-reading aliases (after an alias change)."""
+        self._aliases_dirty = True
+        self._dirty_epoch += 1
 
     def refresh_device_table(self):
         if not alias_manager: return
+        if self._rendered_epoch == self._dirty_epoch:
+            return  # Nothing changed since the last render
         try:
-            self.ui.device_table.setSortingEnabled(False)
             # Restore selection based on actual IP, not display name, for robustness
             selected_actual_ip_to_restore = self.app_state.selected_target_actual_ip
-            row_to_reselect = -1
-
-            self.ui.device_table.setRowCount(len(self.app_state.devices_status))
-            row_idx = 0
-            # Sort by IP for consistent display, or by last_seen if preferred
-            sorted_devices = sorted(self.app_state.devices_status.items(), key=lambda item: item[0])
-
-            for ip, data in sorted_devices:
-                ip_item = QTableWidgetItem(ip)
-                alias_name = alias_manager.get_alias_for_ip(ip)
-                alias_item = QTableWidgetItem(alias_name if alias_name else "")
-                status_item = QTableWidgetItem(data['status'])
-                last_seen_str = data['last_seen'].strftime('%Y-%m-%d %H:%M:%S')
-                last_seen_item = QTableWidgetItem(last_seen_str)
 
-                status_color = QColor('darkGreen') if data['status'] == 'Connected' else \
-                    (QColor('orange') if 'Server Down' in data['status'] else QColor('red'))
-                status_item.setForeground(status_color)
-
-                self.ui.device_table.setItem(row_idx, 0, ip_item)
-                self.ui.device_table.setItem(row_idx, 1, alias_item)
-                self.ui.device_table.setItem(row_idx, 2, status_item)
-                self.ui.device_table.setItem(row_idx, 3, last_seen_item)
-
-                if ip == selected_actual_ip_to_restore:
-                    row_to_reselect = row_idx
-                row_idx += 1
-
-            self.ui.device_table.setSortingEnabled(True)  # Re-enable sorting
+            # Status rows are pushed incrementally by _sync_rows; only an alias edit needs a column re-read
+            if self._aliases_dirty:
+                self._aliases_dirty = False
+                self.model.refresh_aliases()
 
+            row_to_reselect = self._view_row_for_ip(selected_actual_ip_to_restore) \
+                if selected_actual_ip_to_restore is not None else -1
             if row_to_reselect != -1:
-                self.ui.device_table.blockSignals(True)
-                self.ui.device_table.selectRow(row_to_reselect)
-                self.ui.device_table.blockSignals(False)
+                # Selection signals come from the selection model, not the view
+                # QSignalBlocker unblocks even if selectRow raises
+                with QSignalBlocker(self.ui.device_table.selectionModel()):
+                    self.ui.device_table.selectRow(row_to_reselect)
             elif selected_actual_ip_to_restore is not None:  # If previous selection is gone
                 self.app_state.clear_selection_data()
                 self.ui.target_label.setText("Selected Target: None")
 
-
+            self._rendered_epoch = self._dirty_epoch
         except Exception as e:
             self.append_log(f"[GUI ERROR] DeviceTable: Failed to refresh: {e}")
             log.exception("Device table refresh error")
 
+    def _view_row_for_ip(self, ip: str) -> int:
+        """Row of `ip` as shown in the (possibly re-sorted) view, or -1 if it is not in the model."""
+        source_row = self.model.row_for_ip(ip)
+        if source_row == -1:
+            return -1
+        return self.ui.device_proxy.mapFromSource(self.model.index(source_row, 0)).row()
+
+    def _selected_ip(self) -> str | None:
+        selected_rows = self.ui.device_table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+        return selected_rows[0].data(IP_ROLE)
+
     def update_selected_target_from_table(self):
-        selected_items = self.ui.device_table.selectedItems()
-        if selected_items:
-            selected_row = self.ui.device_table.row(selected_items[0])
-            ip_item = self.ui.device_table.item(selected_row, 0)
-            alias_item = self.ui.device_table.item(selected_row, 1)
+        selected_rows = self.ui.device_table.selectionModel().selectedRows()
+        if selected_rows:
+            selected_index = selected_rows[0]
+            actual_ip = selected_index.data(IP_ROLE)
 
-            if ip_item:
-                actual_ip = ip_item.text()
-                display_name = alias_item.text() if alias_item and alias_item.text() else actual_ip
+            if actual_ip:
+                alias_name = selected_index.data(ALIAS_ROLE)
+                display_name = alias_name if alias_name else actual_ip
 
                 if actual_ip != self.app_state.selected_target_actual_ip:  # Check actual IP for change
                     self.app_state.selected_target_ip_display = display_name
@@ -147,44 +247,43 @@ class DeviceTableManager:
 
     def show_device_context_menu(self, position):
         if not alias_manager: return
-        selected_items = self.ui.device_table.selectedItems()
-        if not selected_items: return
+        ip_address = self._selected_ip()
+        if not ip_address: return
 
-        selected_row = self.ui.device_table.row(selected_items[0])
-        ip_item = self.ui.device_table.item(selected_row, 0)
-        if not ip_item: return
-        ip_address = ip_item.text()
+        self._alias_action.setData(ip_address)
+        self._remove_alias_action.setData(ip_address)
+        current_alias = self.model.alias_for(ip_address)
+        self._remove_alias_action.setEnabled(bool(current_alias))
 
-        menu = QMenu(self.parent_window)  # Parent the menu to the main window
-        alias_action = QAction("Assign/Edit Alias...", self.parent_window)
-        # noinspection PyUnresolvedReferences
-        alias_action.triggered.connect(lambda: self.edit_alias_for_ip(ip_address))
-        menu.addAction(alias_action)
+        self._context_menu.exec(self.ui.device_table.viewport().mapToGlobal(position))
 
-        remove_alias_action = QAction("Remove Alias", self.parent_window)
-        # noinspection PyUnresolvedReferences
-        remove_alias_action.triggered.connect(lambda: self.remove_alias_for_ip_action(ip_address))
-        current_alias = alias_manager.get_alias_for_ip(ip_address)
-        remove_alias_action.setEnabled(bool(current_alias))
-        menu.addAction(remove_alias_action)
+    def _on_alias_action(self):
+        ip_address = self._alias_action.data()
+        if ip_address:
+            self.edit_alias_for_ip(ip_address)
 
-        menu.exec(self.ui.device_table.viewport().mapToGlobal(position))
+    def _on_remove_alias_action(self):
+        ip_address = self._remove_alias_action.data()
+        if ip_address:
+            self.remove_alias_for_ip_action(ip_address)
 
     def edit_alias_for_ip(self, ip_address):
         if not alias_manager: return
-        current_alias = alias_manager.get_alias_for_ip(ip_address) or ""
+        current_alias = self.model.alias_for(ip_address)
         dialog = AliasDialog(ip_address, current_alias, self.parent_window)
         if dialog.exec():
             new_alias = dialog.get_alias()
             if new_alias:
                 if alias_manager.add_alias(ip_address, new_alias):
                     self.append_log(f"[GUI] Alias '{new_alias}' set for {ip_address}")
+                    self.mark_dirty()
                     self.refresh_device_table()  # Refresh to show new alias
                 else:
                     QMessageBox.warning(self.parent_window, "Alias Error", "Failed to set alias. Check logs.")
             elif current_alias:
                 if alias_manager.remove_alias_for_ip(ip_address):
                     self.append_log(f"[GUI] Alias removed for {ip_address}")
+                    self.mark_dirty()
                     self.refresh_device_table()
                 else:
                     QMessageBox.warning(self.parent_window, "Alias Error", "Failed to remove alias. Check logs.")
@@ -193,6 +292,7 @@ class DeviceTableManager:
         if not alias_manager: return
         if alias_manager.remove_alias_for_ip(ip_address):
             self.append_log(f"[GUI] Alias removed for {ip_address}")
+            self.mark_dirty()
             self.refresh_device_table()
         else:
             QMessageBox.information(self.parent_window, "Alias Info",
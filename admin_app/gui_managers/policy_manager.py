@@ -1,14 +1,23 @@
 import logging
-import time  # For time.sleep in send_policy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import QMessageBox
-from PyQt6.QtCore import QCoreApplication  # For processEvents
 
 # Assuming these are in parent directory or Python path
-from backend import admin_connect, alias_manager
-from backend.policy_engine import parse_and_generate_commands_for_gui
+from backend import admin_connect
+from admin_app.workers.send_policy_task import SendPolicyTask, MAX_SEND_WORKERS
+from admin_app.workers.callable_task import CallableTask, start_task
 
 log = logging.getLogger(__name__)
 
+_RULE_HDR = "--- Rule {} ({} -> Target: {} [{}]) ---".format  # Bound once, called per previewed rule
+
+
+def _parse_policy(nl_command: str, preferred_target_ip: str | None):
+    # Imported on first use (on the worker thread): policy_engine pulls in spaCy via nlp
+    from backend.policy_engine import parse_and_generate_commands_for_gui
+    return parse_and_generate_commands_for_gui(nl_command, preferred_target_ip=preferred_target_ip)
+
 
 class PolicyManager:
     def __init__(self, ui, app_state, append_log_slot, parent_window):
@@ -16,15 +25,27 @@ class PolicyManager:
         self.app_state = app_state  # Instance of AppState
         self.append_log = append_log_slot
         self.parent_window = parent_window  # For QMessageBox parent
+        self._send_task = None  # SendPolicyTask in flight, if any
+        # Per-target sends reuse these threads instead of spawning a pool for every Send
+        self._send_pool = ThreadPoolExecutor(max_workers=MAX_SEND_WORKERS, thread_name_prefix="PolicySend")
+        self._send_cancel = threading.Event()  # Set on shutdown; checked by in-flight sends
+        self._input_generation = 0  # Bumped on every input edit or target selection change; stale parse results are dropped
+        self._parse_generation = 0  # _input_generation when the in-flight parse was started
 
         self.ui.nl_input.textChanged.connect(self.clear_preview_on_input_change)
+        # The selected device is the parse's preferred target, so a new selection also makes an in-flight parse stale
+        self.ui.device_table.selectionModel().selectionChanged.connect(self._on_target_selection_changed)
         self.ui.preview_btn.clicked.connect(self.preview_policy)
         self.ui.send_btn.clicked.connect(self.send_policy)
 
     def clear_preview_on_input_change(self):
         # This method is connected to textChanged, so it directly calls clear_preview
+        self._input_generation += 1
         self.clear_preview()
 
+    def _on_target_selection_changed(self):
+        self._input_generation += 1
+
     def clear_preview(self):
         self.app_state.clear_preview_data()
         self.ui.preview_area.clear()
@@ -47,53 +68,73 @@ class PolicyManager:
             f"[GUI] Preview requested for: '{nl_command}'. GUI Selected Actual IP: {preferred_target_for_engine}")
 
         self.clear_preview()  # Clear previous state
-        self.ui.preview_area.setPlaceholderText("Generating preview...")
-        QCoreApplication.processEvents()
+        self.ui.preview_area.setPlaceholderText("Generating preview...")  # Painted while the parse runs
+
+        # NLP parsing can take hundreds of ms: run it on the pool and fill the preview when it reports back
+        self.ui.preview_btn.setEnabled(False)
+        self._parse_generation = self._input_generation
+        start_task(CallableTask(_parse_policy, nl_command, preferred_target_for_engine),
+                   finished=self._on_preview_ready, failed=self._on_preview_error)
+
+    def _on_preview_ready(self, generated_tuples):
+        self.ui.preview_btn.setEnabled(True)
+        if self._parse_generation != self._input_generation:
+            self.append_log("[GUI] Input or target changed while parsing; discarded the stale preview.")
+            self.clear_preview()  # A selection change leaves the "Generating preview..." placeholder behind
+            return
 
         try:
-            generated_tuples = parse_and_generate_commands_for_gui(
-                nl_command,
-                preferred_target_ip=preferred_target_for_engine
-            )
-
             if not generated_tuples:
                 self.ui.preview_area.setPlaceholderText("No valid commands generated or rule structure not understood.")
                 QMessageBox.information(self.parent_window, "Preview", "Could not generate commands from the input.")
                 return
 
-            self.app_state.previewed_commands = generated_tuples
-            preview_text = ""
-            for i, (target_ip, source_ip, dest_ip, cmd_list) in enumerate(generated_tuples):
-                context = []
-                alias_fn = alias_manager.get_alias_for_ip if alias_manager else lambda x: None
-
-                if source_ip: context.append(f"Src: {alias_fn(source_ip) or source_ip}")
-                if dest_ip: context.append(f"Dest: {alias_fn(dest_ip) or dest_ip}")
-                target_display = alias_fn(target_ip) or target_ip
-                context_str = ", ".join(context) if context else "General Rule"
-                preview_text += f"--- Rule {i + 1} ({context_str} -> Target: {target_display} [{target_ip}]) ---\n"
+            self.app_state.set_previewed_commands(generated_tuples)
+            parts = []  # Joined once at the end instead of growing a string per line
+            alias_fn = self.ui.device_model.alias_for  # Local alias mirror, no module call per IP
+            for i, (target_ip, source_ip, dest_ip, cmd_list) in enumerate(generated_tuples, 1):
+                src_tok = "Src: " + (alias_fn(source_ip) or source_ip) if source_ip else ""
+                dst_tok = "Dest: " + (alias_fn(dest_ip) or dest_ip) if dest_ip else ""
+                if src_tok and dst_tok:
+                    context_str = src_tok + ", " + dst_tok
+                else:
+                    context_str = src_tok or dst_tok or "General Rule"
+                parts.append(_RULE_HDR(i, context_str, alias_fn(target_ip) or target_ip, target_ip))
 
                 if not cmd_list:
-                    preview_text += "  (No specific commands generated for this rule)\n"
-                for cmd in cmd_list:
-                    preview_text += f"  {cmd}\n"
-                preview_text += "\n"
+                    parts.append("  (No specific commands generated for this rule)")
+                parts.extend(f"  {cmd}" for cmd in cmd_list)
+                parts.append("")
 
-            self.ui.preview_area.setPlainText(preview_text.strip())
+            self.ui.preview_area.setPlainText("\n".join(parts).strip())
             self.ui.send_btn.setEnabled(True)
 
         except Exception as e:
-            self.append_log(f"[GUI ERROR] Policy preview failed: {e}")
             log.exception("Policy preview failed")
-            self.ui.preview_area.setPlaceholderText("Error during preview. Check logs.")
-            QMessageBox.critical(self.parent_window, "Preview Error", f"Failed to parse or generate commands:\n{e}")
-            self.clear_preview()  # Ensure state is clean after error
+            self._show_preview_error(str(e))
+
+    def _on_preview_error(self, error: str):
+        self.ui.preview_btn.setEnabled(True)
+        if self._parse_generation == self._input_generation:
+            self._show_preview_error(error)
+        else:
+            self.append_log(f"[GUI ERROR] Policy preview failed (input or target already changed): {error}")
+            self.clear_preview()
+
+    def _show_preview_error(self, error: str):
+        self.append_log(f"[GUI ERROR] Policy preview failed: {error}")
+        self.ui.preview_area.setPlaceholderText("Error during preview. Check logs.")
+        QMessageBox.critical(self.parent_window, "Preview Error", f"Failed to parse or generate commands:\n{error}")
+        self.clear_preview()  # Ensure state is clean after error
 
     def send_policy(self):
         if not admin_connect:
             QMessageBox.critical(self.parent_window, "Module Error", "admin_connect not loaded.")
             return
-        if not self.app_state.previewed_commands:
+        if self._send_task is not None:
+            QMessageBox.information(self.parent_window, "Send In Progress", "A policy is still being sent.")
+            return
+        if not self.app_state.has_previewed_commands:
             QMessageBox.warning(self.parent_window, "Send Error", "No commands to send. Please preview first.")
             return
         if not self.app_state.is_backend_running:  # Check global backend status
@@ -103,55 +144,20 @@ class PolicyManager:
 
         self.append_log("[GUI] Initiating send of previewed commands...")
         self.ui.send_btn.setEnabled(False)  # Disable while sending
-        QCoreApplication.processEvents()
-
-        sent_count = 0
-        errors_occurred = False
-        total_cmds_to_attempt = sum(len(cl) for _, _, _, cl in self.app_state.previewed_commands)
-
-        for target_ip, _, _, cmd_list in self.app_state.previewed_commands:
-            is_connected = False
-            try:
-                # Check connection status directly from admin_connect's state
-                if hasattr(admin_connect, 'clients_lock') and hasattr(admin_connect, 'clients'):
-                    if admin_connect.clients_lock.acquire(timeout=0.05):  # Short timeout
-                        try:
-                            is_connected = target_ip in admin_connect.clients
-                        finally:
-                            admin_connect.clients_lock.release()
-
-                if not is_connected:
-                    self.append_log(f"[GUI WARN] Target {target_ip} not connected. Skipping {len(cmd_list)} cmds.")
-                    errors_occurred = True
-                    continue
-            except Exception as e:
-                self.append_log(f"[GUI ERROR] Checking connection to {target_ip}: {e}")
-                errors_occurred = True
-                continue  # Skip this target if connection check fails
-
-            for cmd in cmd_list:
-                self.append_log(f"[GUI] Sending to {target_ip}: {cmd}")
-                QCoreApplication.processEvents()
-                try:
-                    admin_connect.send_command(target_ip, cmd)
-                    sent_count += 1
-                    time.sleep(0.05)  # Small delay between commands
-                except ConnectionError as e:  # Specific error from send_command
-                    self.append_log(f"[GUI ERROR] ConnectionError sending to {target_ip}: {e}")
-                    errors_occurred = True
-                    break  # Stop sending to this IP if a connection error occurs
-                except Exception as e:
-                    self.append_log(f"[GUI ERROR] Unexpected error sending command to {target_ip}: {e}")
-                    log.exception("Send command failed")
-                    errors_occurred = True
-                    # Optionally break here too, depending on desired behavior for other errors
-
-            if errors_occurred and target_ip in [t[0] for t in self.app_state.previewed_commands]:
-                # if an error occurred for this target_ip, maybe don't try other commands for it?
-                pass  # Current logic continues to next target_ip if error is within cmd_list loop
+
+        # Lock-free read of the backend's published snapshot
+        connected_ips = self.app_state.get_connected_snapshot()
+
+        task = SendPolicyTask(self.app_state.preview_target_ips, self.app_state.preview_cmd_lists,
+                              self.app_state.preview_total_commands, connected_ips, self._send_pool,
+                              self._send_cancel)
+        self._send_task = start_task(task, progress=self.append_log, done=self._on_send_finished)
+
+    def _on_send_finished(self, sent_count: int, total_cmds_to_attempt: int, errors_occurred: bool):
+        self._send_task = None
 
         # Re-enable send button only if there are still previewed commands (it might be cleared by now)
-        self.ui.send_btn.setEnabled(bool(self.app_state.previewed_commands))
+        self.ui.send_btn.setEnabled(self.app_state.has_previewed_commands)
 
         msg = f"Attempted to send: {total_cmds_to_attempt} command(s). Successfully sent: {sent_count}."
         if errors_occurred:
@@ -160,4 +166,9 @@ class PolicyManager:
         else:
             QMessageBox.information(self.parent_window, "Send Complete", msg)
 
-        self.clear_preview()  # Clear after sending, regardless of outcome
\ No newline at end of file
+        self.clear_preview()  # Clear after sending, regardless of outcome
+
+    def shutdown(self):
+        """Stops the send pool; queued per-target sends are cancelled (called on window close)."""
+        self._send_cancel.set()  # Workers already picked up skip their send
+        self._send_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,147 @@
+import bisect
+import functools
+from datetime import datetime
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+# Assuming these are in parent directory or Python path
+from backend import alias_manager
+
+COLUMN_HEADERS = ["IP Address", "Alias", "Status", "Last Seen"]
+IP_COLUMN, ALIAS_COLUMN, STATUS_COLUMN, LAST_SEEN_COLUMN = range(len(COLUMN_HEADERS))
+# Custom roles answered by every cell of a row, so callers holding any index skip the row -> column lookup
+IP_ROLE = Qt.ItemDataRole.UserRole
+ALIAS_ROLE = Qt.ItemDataRole.UserRole + 1
+
+# Built once instead of parsing a color name per row per repaint; looked up by exact status
+_COLOR_BY_STATUS = {
+    'Connected': QColor('darkGreen'),
+    'Disconnected': QColor('red'),
+    'Disconnected (Server Down)': QColor('orange'),
+}
+_DEFAULT_COLOR = _COLOR_BY_STATUS['Disconnected']
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_last_seen(last_seen_ns: int) -> str:
+    # Rows updated in the same tick share one timestamp, so each distinct value is formatted once
+    return datetime.fromtimestamp(last_seen_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class DeviceTableModel(QAbstractTableModel):
+    """
+    Model behind the device table view.
+
+    Rows are stored as parallel lists (ip/status/last_seen ns) kept sorted by IP,
+    so a status change only notifies the affected cells instead of rebuilding
+    every item of the table.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ips: list[str] = []
+        self._status: list[str] = []
+        self._last_seen: list[int] = []  # time.time_ns() of the last status change, formatted lazily for display
+        # Local mirror of alias_manager's ip -> alias map; re-primed by refresh_aliases()
+        self._alias_cache: dict[str, str] = alias_manager.get_all_ip_aliases()
+
+    # --- QAbstractTableModel interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ips)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMN_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == IP_COLUMN:
+                return self._ips[row]
+            if column == ALIAS_COLUMN:
+                return self._alias_cache.get(self._ips[row], "")
+            if column == STATUS_COLUMN:
+                return self._status[row]
+            if column == LAST_SEEN_COLUMN:
+                # A connected device is being seen right now; its stored time is only the connect time
+                if self._status[row] == 'Connected':
+                    return "Now"
+                return _format_last_seen(self._last_seen[row])
+        elif role == Qt.ItemDataRole.ForegroundRole and column == STATUS_COLUMN:
+            return _COLOR_BY_STATUS.get(self._status[row], _DEFAULT_COLOR)
+        elif role == IP_ROLE:
+            return self._ips[row]
+        elif role == ALIAS_ROLE:
+            return self._alias_cache.get(self._ips[row], "")
+        return None
+
+    def alias_for(self, ip: str) -> str:
+        """Alias of `ip` from the local mirror, or "" if it has none."""
+        return self._alias_cache.get(ip, "")
+
+    # --- Row helpers ---
+    def row_for_ip(self, ip: str) -> int:
+        """Returns the row of `ip`, or -1 if it is not in the model."""
+        row = bisect.bisect_left(self._ips, ip)
+        if row < len(self._ips) and self._ips[row] == ip:
+            return row
+        return -1
+
+    def set_device(self, ip: str, status: str, last_seen: int):
+        """Inserts a new row for `ip` or updates its status/last-seen cells if they changed."""
+        row = self.row_for_ip(ip)
+        if row == -1:
+            row = bisect.bisect_left(self._ips, ip)  # Keeps rows sorted by IP
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._ips.insert(row, ip)
+            self._status.insert(row, status)
+            self._last_seen.insert(row, last_seen)
+            self.endInsertRows()
+            return
+
+        if self._status[row] == status and self._last_seen[row] == last_seen:
+            return  # Nothing to repaint
+        self._status[row] = status
+        self._last_seen[row] = last_seen
+        # noinspection PyUnresolvedReferences
+        self.dataChanged.emit(self.index(row, STATUS_COLUMN), self.index(row, LAST_SEEN_COLUMN),
+                              [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ForegroundRole])
+
+    def reset_devices(self, rows):
+        """
+        Replaces every row at once from (ip, status, last_seen) tuples.
+        One modelReset instead of a dataChanged/insert per row; used for bulk changes.
+        """
+        self.beginResetModel()
+        rows = sorted(rows)
+        self._ips = [row[0] for row in rows]
+        self._status = [row[1] for row in rows]
+        self._last_seen = [row[2] for row in rows]
+        self.endResetModel()
+
+    def remove_device(self, ip: str):
+        """Removes the row of `ip`, if present."""
+        row = self.row_for_ip(ip)
+        if row == -1:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ips[row]
+        del self._status[row]
+        del self._last_seen[row]
+        self.endRemoveRows()
+
+    def refresh_aliases(self):
+        """Re-primes the alias mirror and notifies the view that the alias column must be re-read (after an alias edit)."""
+        # One bulk copy: an edit can also move an alias away from another IP
+        self._alias_cache = alias_manager.get_all_ip_aliases()
+        if self._ips:
+            # noinspection PyUnresolvedReferences
+            self.dataChanged.emit(self.index(0, ALIAS_COLUMN), self.index(len(self._ips) - 1, ALIAS_COLUMN),
+                                  [Qt.ItemDataRole.DisplayRole])
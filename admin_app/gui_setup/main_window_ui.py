@@ -1,10 +1,20 @@
+import functools
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
-    QAbstractItemView, QHeaderView, QLineEdit, QTextEdit, QLabel, QSplitter
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView,
+    QAbstractItemView, QHeaderView, QLineEdit, QTextEdit, QPlainTextEdit, QLabel, QSplitter
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSortFilterProxyModel
 from PyQt6.QtGui import QFont
 
+from admin_app.gui_setup.device_table_model import DeviceTableModel, IP_COLUMN
+
+
+@functools.lru_cache(maxsize=None)
+def log_font() -> QFont:
+    """Shared monospace font for log-style views (built once, after the QApplication exists)."""
+    return QFont("Courier New", 9)
+
+
 class Ui_AdminMainWindow:
     def setup_ui(self, main_window):
         main_window.setWindowTitle("Admin Controller")
@@ -31,17 +41,28 @@ class Ui_AdminMainWindow:
         device_widget = QWidget()
         device_layout = QVBoxLayout(device_widget)
         device_layout.addWidget(QLabel("Connected Devices"))
-        self.device_table = QTableWidget()
-        self.device_table.setColumnCount(4)
-        self.device_table.setHorizontalHeaderLabels(["IP Address", "Alias", "Status", "Last Seen"])
+        self.device_table = QTableView()
+        # The model must be set before configuring header sections (it defines the columns)
+        self.device_model = DeviceTableModel(main_window)
+        # Header click-to-sort goes through a proxy: the model itself stays IP-sorted for its bisect lookups
+        self.device_proxy = QSortFilterProxyModel(main_window)
+        self.device_proxy.setSourceModel(self.device_model)
+        self.device_table.setModel(self.device_proxy)
+        self.device_table.setSortingEnabled(True)
+        self.device_table.sortByColumn(IP_COLUMN, Qt.SortOrder.AscendingOrder)
         self.device_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.device_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.device_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.device_table.verticalHeader().setVisible(False)
-        self.device_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.device_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.device_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
-        self.device_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        # Fixed widths avoid re-measuring cell contents on every model change
+        device_header = self.device_table.horizontalHeader()
+        device_header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
+        device_header.resizeSection(0, 120)
+        device_header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
+        device_header.resizeSection(1, 110)
+        device_header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
+        device_header.resizeSection(2, 170)  # Fits "Disconnected (Server Down)"
+        device_header.setStretchLastSection(True)  # Last Seen takes the remaining width
         self.device_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         device_layout.addWidget(self.device_table)
         splitter.addWidget(device_widget)
@@ -50,9 +71,10 @@ class Ui_AdminMainWindow:
         log_widget = QWidget()
         log_layout = QVBoxLayout(log_widget)
         log_layout.addWidget(QLabel("System Logs"))
-        self.log_view = QTextEdit()
+        self.log_view = QPlainTextEdit()  # Plain block model, no rich-text layout per append
         self.log_view.setReadOnly(True)
-        self.log_view.setFont(QFont("Courier New", 9))
+        self.log_view.setFont(log_font())
+        self.log_view.setMaximumBlockCount(5000)  # Oldest lines are dropped, memory stays flat
         log_layout.addWidget(self.log_view)
         splitter.addWidget(log_widget)
         splitter.setSizes([380, 470])
@@ -86,4 +108,20 @@ class Ui_AdminMainWindow:
         preview_buttons_layout.addWidget(self.send_btn)
         preview_layout.addLayout(preview_buttons_layout)
         policy_layout.addLayout(preview_layout)
-        self.main_layout.addWidget(policy_widget)
\ No newline at end of file
+        self.main_layout.addWidget(policy_widget)
+
+    # --- Bulk device table updates ---
+    def begin_device_update(self):
+        """
+        Suspends repaints and selection signals of the device table for a bulk model change.
+        Must be paired with end_device_update() (use try/finally).
+        """
+        self.device_table.setUpdatesEnabled(False)
+        # Selection signals come from the selection model, not the view
+        self._device_selection_was_blocked = self.device_table.selectionModel().blockSignals(True)
+
+    def end_device_update(self):
+        """Restores what begin_device_update() suspended and repaints the table once."""
+        self.device_table.selectionModel().blockSignals(self._device_selection_was_blocked)
+        self.device_table.setUpdatesEnabled(True)
+        self.device_table.viewport().update()
@@ -1,69 +1,120 @@
+import collections
+import copy
 import logging
+import logging.handlers
+import queue
 import sys
-from PyQt6.QtCore import QObject, pyqtSignal
+import threading
+
+LOG_BUFFER_MAXLEN = 10000  # Oldest records are dropped under log storms
 
 # --- QtLogHandler ---
-class QtLogHandler(logging.Handler, QObject):
-    log_signal = pyqtSignal(str)
+class QtLogHandler(logging.Handler):
+    """
+    Buffers formatted records instead of signalling the GUI per record.
+    The GUI thread drains the buffer periodically and appends it in one batch,
+    so no Qt object or cross-thread signal is involved on the logging path.
+    deque.append/popleft are atomic in CPython, so producers and the drain need no lock.
+    """
 
     def __init__(self):
-        logging.Handler.__init__(self)
-        QObject.__init__(self)
+        super().__init__()
+        self._buf = collections.deque(maxlen=LOG_BUFFER_MAXLEN)
 
     def emit(self, record):
         try:
-            msg = self.format(record)
-            # noinspection PyUnresolvedReferences
-            self.log_signal.emit(msg)
+            # deque.append is thread-safe, so producer threads never touch Qt here
+            self._buf.append(self.format(record))
         except Exception:
             self.handleError(record)
 
+    def append_line(self, line: str):
+        """Buffers an already formatted line (e.g., from a redirected stream)."""
+        self._buf.append(line)
+
+    def drain(self) -> list[str]:
+        """Pops and returns all buffered messages (oldest first)."""
+        batch = []
+        buf = self._buf
+        while buf:
+            batch.append(buf.popleft())
+        return batch
+
+# --- Queue handler ---
+class _ListenerFormatQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the QueueListener's thread.
+    The stock prepare() runs the full formatter (timestamp, traceback) on the logging thread so
+    records can be pickled; this queue never leaves the process, so only the args are merged
+    into the message (callers may mutate them after logging) and exc_info is passed through.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)  # Other handlers of the same logger still see the original
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
 # --- StreamRedirector ---
-class StreamRedirector(QObject):
-    write_signal = pyqtSignal(str)
+class StreamRedirector:
+    """
+    File-like stand-in for stdout/stderr that feeds the same buffer as the log handler.
+    Writes are line-buffered: print() issues the text and the newline as separate writes,
+    and only complete lines are forwarded.
+    """
 
-    def __init__(self, stream_name):
-        super().__init__()
+    def __init__(self, stream_name, log_handler: QtLogHandler):
         self.stream_name = stream_name
+        self.log_handler = log_handler
+        self._pending = ""  # Text after the last newline
+        self._lock = threading.Lock()  # print() may be called from several threads
 
     def write(self, text):
-        if text.strip():
-            # noinspection PyUnresolvedReferences
-            self.write_signal.emit(f"[{self.stream_name}] {text.strip()}")
+        with self._lock:
+            *lines, self._pending = (self._pending + text).split("\n")
+        for line in lines:
+            if line.strip():
+                self.log_handler.append_line(f"[{self.stream_name}] {line.strip()}")
 
     def flush(self):
-        pass
+        with self._lock:
+            line, self._pending = self._pending, ""
+        if line.strip():
+            self.log_handler.append_line(f"[{self.stream_name}] {line.strip()}")
 
 # --- Setup Function ---
-def setup_gui_logging(log_view_append_slot):
+def setup_gui_logging():
     """
-    Configures and connects Qt-specific logging.
-    Returns stdout_redirector, stderr_redirector, and the log_handler.
+    Configures GUI logging: log records and stdout/stderr all go into one buffer,
+    which the GUI drains on a timer.
+    Loggers only enqueue records (QueueHandler); formatting and buffering happen on the
+    QueueListener's thread, which the caller must stop on shutdown.
+    Returns stdout_redirector, stderr_redirector, the log_handler, and the queue listener.
     """
     log_handler = QtLogHandler()
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - [%(name)s] %(message)s', datefmt='%H:%M:%S')
     log_handler.setFormatter(formatter)
 
-    # Add handler to the loggers we want to capture
+    log_queue = queue.SimpleQueue()
+    queue_handler = _ListenerFormatQueueHandler(log_queue)
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+    log_listener.start()
+
+    # Add the queue handler to the loggers we want to capture
     loggers_to_capture = [
         "admin_connect", "policy_engine", "service_mapper",
         "nlp", "alias_manager"
     ]
     for logger_name in loggers_to_capture:
         logger = logging.getLogger(logger_name)
-        logger.addHandler(log_handler)
+        logger.addHandler(queue_handler)
         logger.setLevel(logging.INFO) # Set default level for these loggers
 
-    stdout_redirector = StreamRedirector('stdout')
-    stderr_redirector = StreamRedirector('stderr')
-
-    # Connect signals to the log view's append method
-    log_handler.log_signal.connect(log_view_append_slot)
-    stdout_redirector.write_signal.connect(log_view_append_slot)
-    stderr_redirector.write_signal.connect(log_view_append_slot)
+    stdout_redirector = StreamRedirector('stdout', log_handler)
+    stderr_redirector = StreamRedirector('stderr', log_handler)
 
     # Redirect stdout/stderr
     sys.stdout = stdout_redirector
     sys.stderr = stderr_redirector
 
-    return stdout_redirector, stderr_redirector, log_handler
\ No newline at end of file
+    return stdout_redirector, stderr_redirector, log_handler, log_listener
\ No newline at end of file
@@ -0,0 +1,56 @@
+import logging
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+log = logging.getLogger(__name__)
+
+# Signals after which a task has nothing more to report (CallableTask: finished/failed, SendPolicyTask: done)
+_FINAL_SIGNALS = ("finished", "failed", "done")
+_running = set()  # Tasks started by start_task() that haven't reported back yet
+
+
+class CallableTaskSignals(QObject):
+    finished = pyqtSignal(object)  # Return value of the callable
+    failed = pyqtSignal(str)  # Error message if the callable raised
+
+
+class CallableTask(QRunnable):
+    """
+    Runs a plain callable on a QThreadPool thread and reports the outcome through `signals`.
+    Create it on the GUI thread so the connected slots run there.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = CallableTaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            log.exception("Background task failed")
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+def start_task(task: QRunnable, **slots) -> QRunnable:
+    """
+    Connects each keyword slot to the task signal of that name (e.g. finished=..., failed=...)
+    and starts the task on the global QThreadPool. Call it on the GUI thread.
+
+    The pool drops the runnable once run() returns, while its signals may still be queued for the
+    GUI thread; the task (and with it its signals object) is kept referenced here until a final
+    signal has been delivered.
+    """
+    for name, slot in slots.items():
+        getattr(task.signals, name).connect(slot)
+    for name in _FINAL_SIGNALS:
+        signal = getattr(task.signals, name, None)
+        if signal is not None:
+            signal.connect(lambda *_: _running.discard(task))  # Connected last: runs after the caller's slots
+    _running.add(task)
+    QThreadPool.globalInstance().start(task)
+    return task
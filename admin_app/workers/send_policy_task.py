@@ -0,0 +1,83 @@
+import logging
+import threading
+from concurrent.futures import CancelledError, Executor
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Assuming admin_connect is in the parent directory or Python path
+from backend import admin_connect
+
+log = logging.getLogger(__name__)
+
+MAX_SEND_WORKERS = 8  # Targets sent to in parallel (size of the PolicyManager's send pool)
+
+
+class SendPolicySignals(QObject):
+    progress = pyqtSignal(str)  # Log line for the GUI
+    done = pyqtSignal(int, int, bool)  # sent_count, total_cmds_to_attempt, errors_occurred
+
+
+class SendPolicyTask(QRunnable):
+    """
+    Sends previewed commands off the GUI thread.
+    Commands for one target keep their order; different targets are sent in parallel on `send_pool`.
+    Results are reported back to the GUI thread through `signals`.
+    """
+
+    def __init__(self, target_ips, cmd_lists, total_commands, connected_ips, send_pool: Executor,
+                 cancel_event: threading.Event):
+        super().__init__()
+        self.send_pool = send_pool  # Long-lived, owned by the caller
+        self.cancel_event = cancel_event  # Set by the caller to abort targets not yet sent
+        # Copied so a new preview on the GUI thread can't change what is being sent
+        self.target_ips = list(target_ips)
+        self.cmd_lists = list(cmd_lists)
+        self.total_commands = total_commands
+        self.connected_ips = connected_ips
+        self.signals = SendPolicySignals()  # Created on the GUI thread, so its slots run there
+
+    def run(self):
+        sent_count = 0
+        errors_occurred = False
+        total_cmds_to_attempt = self.total_commands
+
+        # Group commands by target, keeping rule order
+        cmds_by_target: dict[str, list[str]] = {}
+        for target_ip, cmd_list in zip(self.target_ips, self.cmd_lists):
+            if target_ip not in self.connected_ips:
+                self.signals.progress.emit(
+                    f"[GUI WARN] Target {target_ip} not connected. Skipping {len(cmd_list)} cmds.")
+                errors_occurred = True
+                continue
+            cmds_by_target.setdefault(target_ip, []).extend(cmd_list)
+
+        try:
+            if cmds_by_target:
+                results = self.send_pool.map(lambda item: self._send_to_target(*item), cmds_by_target.items())
+                for target_sent, target_errors in results:
+                    sent_count += target_sent
+                    errors_occurred = errors_occurred or target_errors
+        except CancelledError:  # Send pool shut down while closing the window
+            errors_occurred = True
+        except Exception as e:
+            self.signals.progress.emit(f"[GUI ERROR] Policy send failed: {e}")
+            log.exception("Policy send task failed")
+            errors_occurred = True
+        finally:
+            self.signals.done.emit(sent_count, total_cmds_to_attempt, errors_occurred)
+
+    def _send_to_target(self, target_ip: str, cmd_list: list[str]) -> tuple[int, bool]:
+        if self.cancel_event.is_set():
+            return 0, True  # Window closing: don't start new sends
+        # One progress line and one sendall per target instead of one per command
+        self.signals.progress.emit(
+            f"[GUI] Sending {len(cmd_list)} cmd(s) to {target_ip}:\n" + "\n".join(f"  {cmd}" for cmd in cmd_list))
+        try:
+            admin_connect.send_command_batch(target_ip, cmd_list)
+        except ConnectionError as e:  # Specific error from send_command_batch
+            self.signals.progress.emit(f"[GUI ERROR] ConnectionError sending to {target_ip}: {e}")
+            return 0, True
+        except Exception as e:
+            self.signals.progress.emit(f"[GUI ERROR] Unexpected error sending commands to {target_ip}: {e}")
+            log.exception("Send command batch failed")
+            return 0, True
+        return len(cmd_list), False
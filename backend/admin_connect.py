@@ -3,7 +3,8 @@
 admin_connect.py
 
 Discovers Raspberry Pi devices via UDP broadcast requests,
-accepts TCP connections from them, and periodically
+accepts TCP connections from them (all monitored by one
+selector-driven server thread), and periodically
 reports the list of connected device IPs.
 
 Also tracks each connection socket so we can push “policy”
@@ -12,10 +13,15 @@ commands to specific IPs via send_command().
 Modified for increased robustness and logging.
 """
 
+import functools
 import socket
+import sys
 import threading
 import select
+import selectors
 import time
+import queue
+from dataclasses import dataclass
 import logging # Import logging
 
 # -------------------------------------------------------------------
@@ -24,17 +30,51 @@ import logging # Import logging
 DISCOVERY_PORT     = 9999
 TCP_PORT           = 10000
 DISCOVERY_MSG      = b'DISCOVER_PI'
+BROADCAST_ADDR     = '255.255.255.255'  # Literal address: no '<broadcast>' resolution per send
 BROADCAST_INTERVAL = 5  # seconds
+# Keepalive probing for Pi connections (Linux only): idle seconds, probe interval, probes before drop
+KEEPALIVE_IDLE     = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_COUNT    = 3
+# Send buffer for Pi connections: the sockets are non-blocking, so a policy batch must fit in it (kernel caps at wmem_max)
+CLIENT_SNDBUF      = 1 << 20
+MAX_BROADCAST_INTERVAL = 60  # seconds; cap for the back-off while no device joins or leaves
 
 # -------------------------------------------------------------------
 # State & Locks
 # -------------------------------------------------------------------
-connected_devices = set()        # set of IP strings
-clients           = {}           # ip_str -> socket
-devices_lock      = threading.Lock()
-clients_lock      = threading.Lock()
+@dataclass(slots=True)
+class ClientRecord:
+    """One connected Pi."""
+    sock: socket.socket
+
+
+# ip_str -> ClientRecord. Copy-on-write: writers build a new dict under _table_lock and re-bind it,
+# so senders read it without locking.
+_table: dict[str, ClientRecord] = {}
+_table_lock       = threading.Lock()
 stop_event        = threading.Event()
 
+# Wake-up channel for stop: request_stop() writes a byte, and every wait below includes the read end,
+# so all backend loops wake at once with no polling timeout. A socketpair (not os.pipe) so
+# select/selectors accept it on every platform.
+_stop_wake_r, _stop_wake_w = socket.socketpair()
+_stop_wake_r.setblocking(False)
+_STOP_WAKE = object()  # Selector data marking the wake-up socket
+
+# Immutable copy of _table's keys, re-bound (under _table_lock) on every change.
+# Readers such as the GUI take it without locking: a module attribute read is atomic.
+connected_devices_snapshot = frozenset()  # frozenset of IP strings
+
+# Connect/disconnect notifications for the GUI: (DEVICE_CONNECTED | DEVICE_DISCONNECTED, ip)
+# The GUI drains this queue instead of polling connected_devices_snapshot.
+DEVICE_CONNECTED    = 'connected'
+DEVICE_DISCONNECTED = 'disconnected'
+device_events       = queue.SimpleQueue()
+
+# Bumped on every register/unregister; the discovery sender backs off while it stays unchanged
+device_change_count = 0
+
 # --- Get Logger specific to this module ---
 # This allows the GUI logger to capture messages from here if configured
 log = logging.getLogger(__name__)
@@ -43,15 +83,55 @@ if not log.hasHandlers():
      logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 
+def _wake_stop_waiters():
+    """Wakes every loop blocked in _wait_for_stop() or the TCP server's selector."""
+    try:
+        _stop_wake_w.send(b'\0')
+    except OSError:
+        pass  # Buffer full: a wake-up is already pending
+
+
+def _drain_stop_wake():
+    try:
+        while _stop_wake_r.recv(4096):
+            pass
+    except (BlockingIOError, InterruptedError):
+        pass
+
+
+def _wait_for_stop(timeout: float) -> bool:
+    """Waits up to `timeout` seconds, returning early (True) once stop is requested."""
+    if stop_event.is_set():
+        return True
+    select.select([_stop_wake_r], [], [], timeout)
+    return stop_event.is_set()
+
+
+def request_stop():
+    """Signals all backend threads to stop and wakes them immediately."""
+    stop_event.set()
+    _wake_stop_waiters()
+
+
 def udp_discovery_sender():
-    """Broadcast discovery + print connected IPs on the same interval."""
+    """
+    Broadcast discovery + print connected IPs on the same interval.
+    The interval doubles (up to MAX_BROADCAST_INTERVAL) after each broadcast that brought
+    no connect/disconnect, and drops back to BROADCAST_INTERVAL as soon as one happens.
+    """
     sock = None # Initialize sock to None
+    interval = BROADCAST_INTERVAL
+    seen_change_count = device_change_count
+    logged_snapshot = None  # Snapshot the cached device-list text was built from
+    device_list_text = "[]"
     log.info("[UDP] Discovery sender thread started.")
     try:
         log.info("[UDP] Creating UDP socket...")
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         log.info("[UDP] Setting SO_BROADCAST...")
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        # Fix the destination once; each tick is then a plain send() with no sockaddr to build
+        sock.connect((BROADCAST_ADDR, DISCOVERY_PORT))
         # log.info("[UDP] Setting SO_REUSEADDR...") # Removed for UDP socket
         # sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Removed for UDP socket
         log.info("[UDP] Socket configured.")
@@ -59,24 +139,32 @@ def udp_discovery_sender():
         while not stop_event.is_set():
             try:
                 # Broadcast discovery message
-                sock.sendto(DISCOVERY_MSG, ('<broadcast>', DISCOVERY_PORT))
-                log.debug(f"[UDP] Broadcasted discovery to port {DISCOVERY_PORT}") # Changed to debug level
+                sock.send(DISCOVERY_MSG)
+                log.debug("[UDP] Broadcasted discovery to port %d", DISCOVERY_PORT) # Changed to debug level
 
                 # Log connected devices (maybe less frequently or at different level?)
-                with devices_lock:
-                    ips = list(connected_devices)
-                log.info(f"[NET] {len(ips)} device(s) connected: {ips}") # Changed prefix
+                # The snapshot is re-bound on every change, so the sorted list text is rebuilt only then
+                ips = connected_devices_snapshot
+                if ips is not logged_snapshot:
+                    logged_snapshot = ips
+                    device_list_text = str(sorted(ips))
+                log.info("[NET] %d device(s) connected: %s", len(ips), device_list_text) # Changed prefix
 
             except socket.error as e:
                 log.error(f"[UDP] Socket error during broadcast/send: {e}")
                 # Potentially break or pause if socket error persists?
-                stop_event.wait(BROADCAST_INTERVAL) # Wait even if error occurs
+                _wait_for_stop(BROADCAST_INTERVAL) # Wait even if error occurs
             except Exception as e:
                 log.error(f"[UDP] Unexpected error in broadcast loop: {e}")
-                stop_event.wait(BROADCAST_INTERVAL) # Wait even if error occurs
+                _wait_for_stop(BROADCAST_INTERVAL) # Wait even if error occurs
             else:
-                # Wait up to BROADCAST_INTERVAL, but wake early if stopped
-                stop_event.wait(BROADCAST_INTERVAL)
+                # Wait up to the current interval, but wake early if stopped
+                _wait_for_stop(interval)
+                if device_change_count != seen_change_count:
+                    seen_change_count = device_change_count
+                    interval = BROADCAST_INTERVAL  # Devices are (re)joining; keep discovery responsive
+                else:
+                    interval = min(interval * 2, MAX_BROADCAST_INTERVAL)
 
     except socket.error as e:
         log.error(f"[UDP] Failed to create or configure UDP socket: {e}")
@@ -89,66 +177,111 @@ def udp_discovery_sender():
         log.info("[UDP] Discovery sender thread stopped.")
 
 
-def handle_client(conn: socket.socket, addr):
+def _register_client(conn: socket.socket, addr) -> str:
+    """Publishes a new Pi connection (client table, device snapshot, GUI event) and returns its IP."""
+    global _table, connected_devices_snapshot, device_change_count
+    ip = sys.intern(addr[0])  # One shared object per IP: GUI dict/set lookups hit on identity
+    with _table_lock:
+        table = dict(_table)
+        table[ip] = ClientRecord(conn)
+        _table = table
+        connected_devices_snapshot = frozenset(table)
+        device_change_count += 1
+    device_events.put((DEVICE_CONNECTED, ip))
+    log.info(f"[TCP] Device connected and registered: {ip}")
+    return ip
+
+
+def _unregister_client(sel: selectors.BaseSelector, conn: socket.socket, ip: str):
+    """Removes a Pi connection from the selector and the published state, then closes it."""
+    global _table, connected_devices_snapshot, device_change_count
+    log.debug(f"[TCP] Cleaning up connection for {ip}")
+    try:
+        sel.unregister(conn)
+    except (KeyError, ValueError):
+        pass  # Already unregistered
+    with _table_lock:
+        record = _table.get(ip)
+        removed = record is not None and record.sock is conn  # A reconnect may already own this IP
+        if removed:
+            table = dict(_table)
+            del table[ip]
+            _table = table
+            connected_devices_snapshot = frozenset(table)
+            device_change_count += 1
+    if removed:
+        device_events.put((DEVICE_DISCONNECTED, ip))
+        log.info(f"[TCP] Device unregistered: {ip}")
+    conn.close()
+
+
+def _tune_client_socket(conn: socket.socket):
     """
-    Each Pi connection runs here: registers IP/socket, monitors, unregisters.
+    Disables Nagle (commands are small and latency-sensitive), enables keepalive to notice dead Pis,
+    and enlarges the send buffer so a batched sendall on the non-blocking socket doesn't hit EAGAIN.
     """
-    ip = addr[0]
-    log.info(f"[TCP] New connection attempt from {ip}:{addr[1]}")
-    registered = False
     try:
-        # Register
-        with devices_lock:
-            connected_devices.add(ip)
-        with clients_lock:
-            clients[ip] = conn
-        registered = True
-        log.info(f"[TCP] Device connected and registered: {ip}")
-
-        # Monitor for disconnect or data (ignoring data for now)
-        conn.setblocking(False) # Use non-blocking with select
-        while not stop_event.is_set():
-            # Wait for readability (data or disconnect) or timeout
-            rlist, _, _ = select.select([conn], [], [], 1.0) # 1 second timeout
-            if not rlist: # Timeout, loop continues checking stop_event
-                continue
-
-            # Socket is readable, check for data or close
-            try:
-                data = conn.recv(1024)
-                if not data:
-                    log.info(f"[TCP] Device {ip} disconnected (recv returned empty).")
-                    break # Exit loop on clean disconnect
-                else:
-                    log.debug(f"[TCP] Received {len(data)} bytes from {ip} (ignored).")
-                    # Handle incoming data if needed in the future
-                    pass
-            except (ConnectionResetError, ConnectionAbortedError):
-                log.warning(f"[TCP] Device {ip} connection reset/aborted.")
-                break # Exit loop on forceful disconnect
-            except socket.error as e:
-                log.error(f"[TCP] Socket error reading from {ip}: {e}")
-                break # Exit loop on other socket errors
-
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CLIENT_SNDBUF)
+        if hasattr(socket, 'TCP_KEEPIDLE'):  # Linux; elsewhere the OS defaults apply
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+    except OSError as e:
+        log.warning(f"[TCP] Could not set socket options: {e}")
+
+
+def _accept_client(sel: selectors.BaseSelector, srv: socket.socket):
+    """Accepts one pending connection and registers it with the selector for reads."""
+    try:
+        conn, addr = srv.accept()
+    except (BlockingIOError, InterruptedError):
+        return  # Nothing pending after all
+    log.info(f"[TCP] New connection attempt from {addr[0]}:{addr[1]}")
+    conn.setblocking(False)
+    _tune_client_socket(conn)
+    try:
+        ip = _register_client(conn, addr)
     except Exception as e:
-        log.error(f"[TCP] Unexpected error in handler for {ip}: {e}")
-    finally:
-        log.debug(f"[TCP] Cleaning up connection for {ip}")
-        # Ensure unregistration only if registration happened
-        if registered:
-            with devices_lock:
-                connected_devices.discard(ip)
-            with clients_lock:
-                clients.pop(ip, None)
-            log.info(f"[TCP] Device unregistered: {ip}")
-        # Ensure socket is closed
+        log.error(f"[TCP] Failed to register connection from {addr[0]}: {e}")
         conn.close()
-        log.info(f"[TCP] Handler thread for {ip} stopped.")
+        return
+    sel.register(conn, selectors.EVENT_READ, data=ip)
+
+
+def _on_readable(sel: selectors.BaseSelector, conn: socket.socket, ip: str):
+    """Reads from a ready Pi socket; unregisters it on disconnect or error."""
+    try:
+        data = conn.recv(1024)
+    except (BlockingIOError, InterruptedError):
+        return  # Spurious wakeup
+    except (ConnectionResetError, ConnectionAbortedError):
+        log.warning(f"[TCP] Device {ip} connection reset/aborted.")
+        _unregister_client(sel, conn, ip)
+        return
+    except socket.error as e:
+        log.error(f"[TCP] Socket error reading from {ip}: {e}")
+        _unregister_client(sel, conn, ip)
+        return
+
+    if not data:
+        log.info(f"[TCP] Device {ip} disconnected (recv returned empty).")
+        _unregister_client(sel, conn, ip)
+    else:
+        if log.isEnabledFor(logging.DEBUG):  # Per-read path: skip formatting unless debugging
+            log.debug(f"[TCP] Received {len(data)} bytes from {ip} (ignored).")
+        # Handle incoming data if needed in the future
 
 
 def tcp_server():
-    """Listens for Pi connections and spawns a handler thread each time."""
+    """
+    Listens for Pi connections and monitors all of them from this one thread.
+    The listening socket and every client socket share one selector (epoll on Linux),
+    so the thread count stays constant however many Pis connect.
+    """
     srv = None # Initialize srv to None
+    sel = selectors.DefaultSelector()
     log.info("[TCP] Server thread started.")
     try:
         log.info("[TCP] Creating TCP socket...")
@@ -159,31 +292,30 @@ def tcp_server():
         srv.bind(('', TCP_PORT))
         log.info("[TCP] Listening for connections...")
         srv.listen()
-        # Use timeout to allow checking stop_event periodically
-        srv.settimeout(1.0)
+        srv.setblocking(False)
+        sel.register(srv, selectors.EVENT_READ, data=None)  # data=None marks the listening socket
+        sel.register(_stop_wake_r, selectors.EVENT_READ, data=_STOP_WAKE)
         log.info(f"[TCP] Server listening on port {TCP_PORT}")
 
         while not stop_event.is_set():
             try:
-                # Accept connections
-                conn, addr = srv.accept()
-                # Start a handler thread for the new client
-                threading.Thread(
-                    target=handle_client,
-                    args=(conn, addr),
-                    daemon=True # Ensure threads exit if main program exits
-                ).start()
-            except socket.timeout:
-                # Timeout occurred, loop back to check stop_event
-                continue
+                # No timeout: request_stop() wakes this through _stop_wake_r
+                for key, _ in sel.select():
+                    if key.data is _STOP_WAKE:
+                        if not stop_event.is_set():
+                            _drain_stop_wake()  # Stray wake-up; don't spin on it
+                        continue  # Loop condition sees stop_event
+                    if key.data is None:
+                        _accept_client(sel, srv)
+                    else:
+                        _on_readable(sel, key.fileobj, key.data)
             except socket.error as e:
                 # Handle specific socket errors if needed, e.g., connection abort
-                log.error(f"[TCP] Socket error during accept: {e}")
-                # Consider a small delay before retrying accept on error
+                log.error(f"[TCP] Socket error in server loop: {e}")
+                # Consider a small delay before retrying on error
                 time.sleep(0.1)
             except Exception as e:
-                log.error(f"[TCP] Unexpected error during accept loop: {e}")
-                # Consider breaking the loop on unexpected errors?
+                log.error(f"[TCP] Unexpected error in server loop: {e}")
                 time.sleep(0.1)
 
     except socket.error as e:
@@ -191,43 +323,80 @@ def tcp_server():
     except Exception as e:
         log.error(f"[TCP] Unexpected error setting up TCP server: {e}")
     finally:
+        # Drop every still-connected Pi so the GUI sees the disconnects
+        for key in list(sel.get_map().values()):
+            if key.data is not None and key.data is not _STOP_WAKE:
+                _unregister_client(sel, key.fileobj, key.data)
+        sel.close()
         if srv:
             log.info("[TCP] Closing server socket.")
             srv.close()
         log.info("[TCP] Server thread stopped.")
 
 
+@functools.lru_cache(maxsize=512)
+def _encode_cmd(cmd_str: str) -> bytes:
+    """Newline-terminated UTF-8 payload for one command; repeated policy lines are encoded once."""
+    return cmd_str.encode('utf-8') + b'\n'
+
+
 def send_command(ip: str, cmd_str: str):
     """
     Send a command string to the Pi at `ip` via its TCP socket.
     """
-    sock = None
-    with clients_lock:
-        sock = clients.get(ip) # Get the socket safely
+    record = _table.get(ip) # Lock-free: `_table` is never mutated, only re-bound
 
-    if not sock:
+    if not record:
         log.warning(f"[CMD] No active connection found for IP {ip}. Cannot send command.")
         raise ConnectionError(f"No active connection to {ip}") # Raise error for GUI
 
     try:
-        payload = cmd_str.encode('utf-8') + b'\n' # Ensure UTF-8 and newline
+        payload = _encode_cmd(cmd_str) # UTF-8 + newline, cached per command string
         log.info(f"[CMD] Sending to {ip}: {cmd_str}")
-        sock.sendall(payload)
-        log.debug(f"[CMD] Successfully sent {len(payload)} bytes to {ip}.")
+        record.sock.sendall(payload)
+        log.debug("[CMD] Successfully sent %d bytes to %s.", len(payload), ip)
     except socket.error as e:
         log.error(f"[CMD] Socket error sending command to {ip}: {e}")
         # Optionally, trigger removal of the client connection here if send fails?
-        # (Requires careful handling to avoid deadlocks if handle_client also removes)
+        # (Requires careful handling to avoid deadlocks if the server thread also removes it)
         raise ConnectionError(f"Socket error sending to {ip}: {e}") from e
     except Exception as e:
         log.error(f"[CMD] Unexpected error sending command to {ip}: {e}")
         raise ConnectionError(f"Unexpected error sending to {ip}: {e}") from e
 
 
+def send_command_batch(ip: str, cmd_list: list[str]):
+    """
+    Send several command strings to the Pi at `ip` as one newline-delimited payload (single sendall).
+    The device splits the stream on newlines, so this is equivalent to calling send_command per command.
+    """
+    if not cmd_list:
+        return
+    record = _table.get(ip) # Lock-free: `_table` is never mutated, only re-bound
+
+    if not record:
+        log.warning(f"[CMD] No active connection found for IP {ip}. Cannot send {len(cmd_list)} command(s).")
+        raise ConnectionError(f"No active connection to {ip}") # Raise error for GUI
+
+    try:
+        # Per-command encodings are cached, so a policy re-sent to several Pis is encoded once
+        payload = b"".join(map(_encode_cmd, cmd_list))
+        log.info(f"[CMD] Sending {len(cmd_list)} command(s) to {ip}")
+        record.sock.sendall(payload)
+        log.debug("[CMD] Successfully sent %d bytes to %s.", len(payload), ip)
+    except socket.error as e:
+        log.error(f"[CMD] Socket error sending command batch to {ip}: {e}")
+        raise ConnectionError(f"Socket error sending to {ip}: {e}") from e
+    except Exception as e:
+        log.error(f"[CMD] Unexpected error sending command batch to {ip}: {e}")
+        raise ConnectionError(f"Unexpected error sending to {ip}: {e}") from e
+
+
 def main():
     """Starts UDP broadcaster and TCP server threads."""
     log.info("--- admin_connect starting ---")
     stop_event.clear() # Ensure stop_event is clear
+    _drain_stop_wake()  # Discard the wake-up byte of a previous stop
 
     log.info("Starting UDP discovery sender thread...")
     udp_thread = threading.Thread(target=udp_discovery_sender, daemon=True)
@@ -241,19 +410,23 @@ def main():
     # Keep main thread alive waiting for stop_event
     try:
         # Instead of just waiting, maybe periodically check thread health?
-        while not stop_event.is_set():
+        udp_reported = tcp_reported = False # Warn once per dead thread, not every second
+        # wait() returns as soon as stop_event is set instead of finishing a fixed sleep
+        while not stop_event.wait(1.0):
             # Check if threads are alive (optional)
-            if not udp_thread.is_alive():
+            if not udp_reported and not udp_thread.is_alive():
                  log.warning("UDP discovery thread unexpectedly terminated.")
+                 udp_reported = True
                  # Decide if we should restart it or stop everything?
                  # break # Or handle restart
-            if not tcp_thread.is_alive():
+            if not tcp_reported and not tcp_thread.is_alive():
                  log.warning("TCP server thread unexpectedly terminated.")
+                 tcp_reported = True
                  # break # Or handle restart
-            time.sleep(1) # Check stop event every second
     except KeyboardInterrupt:
         log.info("KeyboardInterrupt received, signalling threads to stop.")
         stop_event.set()
+    _wake_stop_waiters()  # Also covers callers that only set stop_event
 
     # Wait briefly for threads to potentially finish cleanup after stop_event is set
     log.info("Waiting for threads to stop...")
@@ -4,52 +4,73 @@ alias_manager.py
 Manages in-memory storage and lookup of IP address aliases.
 """
 import logging
+import threading
 
 log = logging.getLogger(__name__)
 
-# In-memory storage for aliases: { "alias_name": "ip_address" }
-# And reverse lookup: { "ip_address": "alias_name" } for display
+# In-memory storage for aliases: { "alias_name_lower": "ip_address" }
+# And reverse lookup: { "ip_address": "Alias Name" } for display (original case as entered)
+# Copy-on-write: writers build new dicts under _write_lock and re-bind the names,
+# so lookups (GUI thread, parser worker) read them without locking.
 _aliases_to_ip = {}
 _ip_to_aliases = {}
+_write_lock = threading.Lock()
+# Bumped on every change so callers can cache alias-dependent results (e.g., parsed policies)
+_version = 0
 
 def add_alias(ip_address: str, alias_name: str) -> bool:
     """
     Adds or updates an alias for an IP address.
-    Alias names are case-insensitive for storage (converted to lowercase).
+    Alias names are case-insensitive for lookup (keyed in lowercase); the original case is kept for display.
     """
     if not ip_address or not alias_name:
         log.warning("[Alias] Attempted to add empty IP or alias.")
         return False
 
+    global _aliases_to_ip, _ip_to_aliases, _version
+    if _ip_to_aliases.get(ip_address) == alias_name:
+        return True  # Same mapping already stored: no rebuild, no version bump (caches stay valid)
+
     alias_name_lower = alias_name.lower()
 
-    # Remove any existing alias for this IP (if it's changing)
-    if ip_address in _ip_to_aliases:
-        old_alias = _ip_to_aliases[ip_address]
-        if old_alias in _aliases_to_ip:
-            del _aliases_to_ip[old_alias]
-        log.debug(f"[Alias] Removing old alias '{old_alias}' for IP {ip_address}.")
-
-    # Remove any existing IP for this alias name (if it's being reassigned)
-    if alias_name_lower in _aliases_to_ip:
-        old_ip = _aliases_to_ip[alias_name_lower]
-        if old_ip in _ip_to_aliases and _ip_to_aliases[old_ip] == alias_name_lower:
-            del _ip_to_aliases[old_ip]
-        log.debug(f"[Alias] Alias '{alias_name_lower}' was previously assigned to {old_ip}.")
-
-    _aliases_to_ip[alias_name_lower] = ip_address
-    _ip_to_aliases[ip_address] = alias_name_lower # Store the lowercase alias for consistency
+    with _write_lock:
+        aliases_to_ip = dict(_aliases_to_ip)
+        ip_to_aliases = dict(_ip_to_aliases)
+
+        # Remove any existing alias for this IP (if it's changing); pop() probes each key once
+        old_alias = ip_to_aliases.pop(ip_address, None)
+        if old_alias is not None:
+            aliases_to_ip.pop(old_alias.lower(), None)
+            log.debug(f"[Alias] Removing old alias '{old_alias}' for IP {ip_address}.")
+
+        # Remove any existing IP for this alias name (if it's being reassigned)
+        old_ip = aliases_to_ip.get(alias_name_lower)
+        if old_ip is not None:
+            ip_to_aliases.pop(old_ip, None)
+            log.debug(f"[Alias] Alias '{alias_name_lower}' was previously assigned to {old_ip}.")
+
+        aliases_to_ip[alias_name_lower] = ip_address
+        ip_to_aliases[ip_address] = alias_name # Display name; lowercased only on writes, never on reads
+        _aliases_to_ip, _ip_to_aliases = aliases_to_ip, ip_to_aliases
+        _version += 1
     log.info(f"[Alias] Added/Updated alias: '{alias_name}' -> {ip_address}")
     return True
 
 def remove_alias_for_ip(ip_address: str) -> bool:
     """Removes any alias associated with the given IP address."""
-    if ip_address in _ip_to_aliases:
-        alias_name_lower = _ip_to_aliases.pop(ip_address) # Remove from IP-to-alias
-        if alias_name_lower in _aliases_to_ip:
-            _aliases_to_ip.pop(alias_name_lower) # Remove from alias-to-IP
-            log.info(f"[Alias] Removed alias '{alias_name_lower}' for IP {ip_address}.")
-            return True
+    global _aliases_to_ip, _ip_to_aliases, _version
+    with _write_lock:
+        alias_name = _ip_to_aliases.get(ip_address)
+        if alias_name is not None:
+            ip_to_aliases = dict(_ip_to_aliases)
+            del ip_to_aliases[ip_address] # Remove from IP-to-alias
+            aliases_to_ip = dict(_aliases_to_ip)
+            aliases_to_ip.pop(alias_name.lower(), None) # Remove from alias-to-IP
+            _aliases_to_ip, _ip_to_aliases = aliases_to_ip, ip_to_aliases
+            _version += 1
+    if alias_name is not None:
+        log.info(f"[Alias] Removed alias '{alias_name}' for IP {ip_address}.")
+        return True
     log.warning(f"[Alias] No alias found to remove for IP {ip_address}.")
     return False
 
@@ -62,14 +83,22 @@ def get_ip_for_alias(alias_name: str) -> str | None:
 def get_alias_for_ip(ip_address: str) -> str | None:
     """
     Retrieves the alias name for a given IP address.
-    Returns the stored (lowercase) alias.
+    Returns the alias as it was entered (original case).
     """
     return _ip_to_aliases.get(ip_address)
 
 def get_all_aliases() -> dict:
-    """Returns a copy of the alias to IP mapping."""
+    """Returns a copy of the (lowercase) alias to IP mapping."""
     return _aliases_to_ip.copy()
 
+def get_all_ip_aliases() -> dict:
+    """Returns a copy of the IP to alias (display name) mapping, for callers that mirror it locally."""
+    return _ip_to_aliases.copy()
+
+def get_version() -> int:
+    """Returns a counter that changes whenever an alias is added, updated or removed."""
+    return _version
+
 # Example usage
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
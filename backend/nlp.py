@@ -2,29 +2,57 @@ import spacy
 from spacy.matcher import Matcher
 import logging
 import re
+import threading
 # Assuming alias_manager.py is in the same 'backend' package
 from backend import alias_manager  # Relative import for sibling module in package
 
 log = logging.getLogger(__name__)
 
 # --- SpaCy Model and Matcher Setup ---
-try:
-    nlp_model = spacy.load("en_core_web_sm")
-except OSError:
-    log.error("Spacy model 'en_core_web_sm' not found. Please run: python -m spacy download en_core_web_sm")
-    # In a real app, might raise a more specific error or have a fallback
-    nlp_model = None  # Allow the program to continue but log errors when nlp_model is used
-    # raise SystemExit("Spacy model not found, NLP functionality will be impaired.")
-
-# Matcher for IPv4 addresses
-ip_matcher = Matcher(nlp_model.vocab if nlp_model else spacy.blank("en").vocab)  # Handle nlp_model being None
-if nlp_model:  # Only add pattern if model loaded
-    ip_matcher.add(
-        "IP_ADDRESS",
-        [[{"TEXT": {"REGEX": r"^(?:\d{1,3}\.){3}\d{1,3}$"}}]]
-    )
-else:
-    log.warning("NLP model not loaded. IP address matching will not function.")
+nlp_model = None
+ip_matcher = None
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """
+    Loads the spaCy model and the IP matcher once; later calls return immediately.
+    Safe to call from any thread. Returns the model, or None if it could not be loaded.
+    """
+    global nlp_model, ip_matcher
+    with _model_lock:
+        if ip_matcher is not None:
+            return nlp_model
+        try:
+            model = spacy.load("en_core_web_sm")
+        except OSError:
+            log.error("Spacy model 'en_core_web_sm' not found. Please run: python -m spacy download en_core_web_sm")
+            # In a real app, might raise a more specific error or have a fallback
+            model = None  # Allow the program to continue but log errors when nlp_model is used
+            # raise SystemExit("Spacy model not found, NLP functionality will be impaired.")
+
+        # Matcher for IPv4 addresses
+        matcher = Matcher(model.vocab if model else spacy.blank("en").vocab)  # Handle model being None
+        if model:  # Only add pattern if model loaded
+            matcher.add(
+                "IP_ADDRESS",
+                [[{"TEXT": {"REGEX": r"^(?:\d{1,3}\.){3}\d{1,3}$"}}]]
+            )
+        else:
+            log.warning("NLP model not loaded. IP address matching will not function.")
+        nlp_model, ip_matcher = model, matcher
+    return nlp_model
+
+
+def warmup():
+    """Runs the pipeline once on a throwaway sentence so the first real parse doesn't pay first-call costs."""
+    model = load_model()
+    if model is not None:
+        doc = model("deny ssh from 10.0.0.1 to 10.0.0.2")
+        ip_matcher(doc)
+
+
+load_model()  # Loaded at import as before, so nlp_model is ready for direct users of the module
 
 # --- Constants ---
 ACTION_VERBS = {
@@ -1,6 +1,8 @@
+import functools
 import logging
 # Assuming nlp.py is in the same 'backend' package
 from . import nlp  # Relative import for sibling module in package
+from . import alias_manager
 # Import new components
 from .policy_components.rule_interpreter import RuleInterpreter
 from .policy_components.iptables_command_builder import IPTablesCommandBuilder, SERVICES_TO_IGNORE
@@ -103,13 +105,23 @@ def get_policy_engine_instance():
     return _policy_engine_instance
 
 
+@functools.lru_cache(maxsize=128)
+def _cached_parse(nl_text: str, preferred_target_ip: str | None, alias_version: int) -> tuple:
+    # alias_version is only part of the key: NLP resolves aliases, so an alias edit must miss the cache
+    engine = get_policy_engine_instance()
+    return tuple((target, src, dest, tuple(cmds))
+                 for target, src, dest, cmds in engine.parse_and_generate_commands(nl_text, preferred_target_ip))
+
+
 def parse_and_generate_commands_for_gui(nl_text: str, preferred_target_ip: str | None = None):
     """
     Convenience function for the GUI to call.
-    Uses a singleton PolicyEngine instance.
+    Uses a singleton PolicyEngine instance. Results are memoized per (text, preferred target, alias version),
+    so re-previewing the same command skips the NLP pipeline.
     """
-    engine = get_policy_engine_instance()
-    return engine.parse_and_generate_commands(nl_text, preferred_target_ip)
+    cached = _cached_parse(nl_text, preferred_target_ip, alias_manager.get_version())
+    # Fresh lists each call so callers can't mutate the cached entry
+    return [(target, src, dest, list(cmds)) for target, src, dest, cmds in cached]
 
 
 # Example usage (if run directly - ensure paths are correct for imports)
@@ -142,14 +154,9 @@ if __name__ == "__main__":
 
     # Sample test (NLP part might not fully work if model isn't found easily here)
     if hasattr(nlp, 'nlp') and nlp.nlp is not None:
-        # Setup some aliases for testing if alias_manager is available
-        try:
-            from . import alias_manager  # Try relative import for alias_manager
-
-            alias_manager.add_alias("192.168.1.100", "MyServer")
-            alias_manager.add_alias("192.168.1.200", "AttackerPC")
-        except ImportError:
-            print("WARN: alias_manager not available for standalone test.")
+        # Setup some aliases for testing (alias_manager is imported at module level)
+        alias_manager.add_alias("192.168.1.100", "MyServer")
+        alias_manager.add_alias("192.168.1.200", "AttackerPC")
 
         test_nl1 = "on MyServer deny ssh from AttackerPC"
         preferred1 = "192.168.1.11"  # Should be ignored if MyServer resolves
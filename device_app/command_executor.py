@@ -7,34 +7,64 @@ log = logging.getLogger(__name__)
 # --- Command Execution Constants ---
 # You MUST verify this path on your Raspberry Pi using 'which iptables'
 IPTABLES_PATH = "/usr/sbin/iptables"
+IPTABLES_RESTORE_PATH = "/usr/sbin/iptables-restore"
 # Basic sanitization: allows letters, numbers, spaces, '.', '-', '/', '=', ':' (for ports), '*' (for any interface/IP)
 # This is a basic measure. Robust sanitization for iptables is complex.
 ALLOWED_IPTABLES_CHARS_PATTERN = re.compile(r"^[a-zA-Z0-9\s\.\-\/\=\:\*]+$")
+# Filter-table rule edits that iptables-restore accepts verbatim as body lines
+RESTORE_RULE_PREFIXES = ("-A ", "-I ", "-D ")
 
 
-def execute_firewall_command(command_string: str) -> tuple[bool, str]:
+def _selects_table(rule_line: str) -> bool:
     """
-    Validates and executes a firewall command string (expected to be iptables).
+    True if the rule names a table (-t nat, -tnat, --table nat, --table=nat, or an abbreviation like --tab).
+    Such rules can't go into the *filter section of an iptables-restore payload.
+    """
+    for token in rule_line.split():
+        option = token.split("=", 1)[0]
+        if option.startswith("--"):
+            # getopt_long accepts unambiguous prefixes of long options
+            if len(option) > 3 and "--table".startswith(option):
+                return True
+        elif option.startswith("-t"):
+            return True
+    return False
 
-    Args:
-        command_string: The command string to execute.
 
-    Returns:
-        A tuple (success: bool, output_message: str).
+def _validated_args(command_string: str) -> tuple[str | None, str]:
+    """
+    Validates a firewall command string.
+    Returns (arguments after 'iptables ', "") if valid, or (None, error message) otherwise.
     """
-    log.info(f"[CmdExec] Attempting to execute: {command_string}")
-
     # 1. Basic Validation: Must start with "iptables " (note the space)
     if not command_string.startswith("iptables "):
         msg = "Command does not start with 'iptables '."
         log.error(f"[CmdExec Validation] {msg}")
-        return False, msg
+        return None, msg
 
     # 2. Basic Character Sanitization
     actual_command_args = command_string[len("iptables "):]
     if not ALLOWED_IPTABLES_CHARS_PATTERN.match(actual_command_args):
         msg = f"Command arguments contain disallowed characters: '{actual_command_args}'"
         log.error(f"[CmdExec Validation] {msg}")
+        return None, msg
+    return actual_command_args, ""
+
+
+def execute_firewall_command(command_string: str) -> tuple[bool, str]:
+    """
+    Validates and executes a firewall command string (expected to be iptables).
+
+    Args:
+        command_string: The command string to execute.
+
+    Returns:
+        A tuple (success: bool, output_message: str).
+    """
+    log.info(f"[CmdExec] Attempting to execute: {command_string}")
+
+    actual_command_args, msg = _validated_args(command_string)
+    if actual_command_args is None:
         return False, msg
 
     # 3. Prepare command for subprocess
@@ -43,7 +73,7 @@ def execute_firewall_command(command_string: str) -> tuple[bool, str]:
         log.debug(f"[CmdExec] Prepared command list: {cmd_list}")
     except Exception as e:
         msg = f"Error preparing command list: {e}"
-        log.exception(f"[CmdExec Preparation Error]") # Log with traceback
+        log.exception("[CmdExec Preparation Error]") # Log with traceback
         return False, msg
 
     # 4. Execute the command
@@ -73,5 +103,62 @@ def execute_firewall_command(command_string: str) -> tuple[bool, str]:
         return False, msg
     except Exception as e:
         msg = f"An unexpected error occurred during command execution: {e}"
-        log.exception(f"[CmdExec Unexpected Error]") # Log with traceback
-        return False, msg
\ No newline at end of file
+        log.exception("[CmdExec Unexpected Error]") # Log with traceback
+        return False, msg
+
+
+def execute_firewall_batch(command_strings: list[str]) -> tuple[bool, str]:
+    """
+    Applies several firewall commands with a single `iptables-restore --noflush` run
+    (one process and one atomic commit instead of one iptables process per rule).
+
+    Only filter-table -A/-I/-D rules are batched. All-or-nothing: if any command is not
+    eligible or the restore fails, nothing is applied and (False, reason) is returned so
+    the caller can fall back to execute_firewall_command per command.
+
+    Args:
+        command_strings: The command strings to apply, in order.
+
+    Returns:
+        A tuple (success: bool, output_message: str).
+    """
+    log.info(f"[CmdExec] Attempting batch of {len(command_strings)} command(s) via iptables-restore")
+
+    rule_lines = []
+    for command_string in command_strings:
+        actual_command_args, msg = _validated_args(command_string)
+        if actual_command_args is None:
+            return False, msg
+        rule_line = actual_command_args.strip()
+        if not rule_line.startswith(RESTORE_RULE_PREFIXES) or _selects_table(rule_line):
+            return False, f"Command not eligible for iptables-restore: '{command_string}'"
+        rule_lines.append(rule_line)
+
+    payload = "*filter\n" + "\n".join(rule_lines) + "\nCOMMIT\n"
+    try:
+        # -n: fail at once instead of prompting when sudo isn't passwordless for iptables-restore
+        result = subprocess.run(['sudo', '-n', IPTABLES_RESTORE_PATH, '--noflush'], input=payload,
+                                capture_output=True, text=True, check=False, timeout=15)
+    except FileNotFoundError:
+        msg = f"Error: '{IPTABLES_RESTORE_PATH}' or 'sudo' not found."
+        log.error(f"[CmdExec FileNotFoundError] {msg}")
+        return False, msg
+    except subprocess.TimeoutExpired:
+        msg = "Error: iptables-restore timed out."
+        log.error(f"[CmdExec Timeout] {msg}")
+        return False, msg
+    except Exception as e:
+        msg = f"An unexpected error occurred during iptables-restore: {e}"
+        log.exception("[CmdExec Unexpected Error]")
+        return False, msg
+
+    if result.returncode != 0:
+        error_details = f"iptables-restore return code: {result.returncode}."
+        if result.stderr:
+            error_details += f" Stderr: {result.stderr.strip()}."
+        log.error(f"[CmdExec Failed] {error_details}")
+        return False, error_details
+
+    output_msg = f"Applied {len(rule_lines)} rule(s) via iptables-restore."
+    log.info(f"[CmdExec Success] {output_msg}")
+    return True, output_msg
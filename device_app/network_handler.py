@@ -22,6 +22,7 @@ def monitor_connection(sock: socket.socket, stop_event: threading.Event):
     """
     sock.setblocking(False)
     log.info("[NetHandler TCP] Monitoring connection for commands...")
+    pending = b""  # Bytes after the last newline; a batch may span several recv() calls
     try:
         while not stop_event.is_set():
             rlist, _, _ = select.select([sock], [], [], 1.0)
@@ -34,14 +35,23 @@ def monitor_connection(sock: socket.socket, stop_event: threading.Event):
                     log.info("[NetHandler TCP] Disconnected by admin (recv returned empty).")
                     break
 
-                command_string = data.decode().strip()
+                pending += data
+                *complete_lines, pending = pending.split(b"\n")
+                if not complete_lines:
+                    continue  # No full command yet
+                command_string = b"\n".join(complete_lines).decode().strip()
                 log.info(f"[NetHandler TCP] Received raw command string: '{command_string}'")
 
-                for single_cmd in command_string.splitlines():
-                    single_cmd = single_cmd.strip()
-                    if not single_cmd:
+                commands = [line.strip() for line in command_string.splitlines() if line.strip()]
+                if len(commands) > 1:
+                    # A batch from the admin: try one iptables-restore run before falling back to per-command execution
+                    success, output_msg = command_executor.execute_firewall_batch(commands)
+                    if success:
+                        log.info(f"[NetHandler EXEC] Successfully applied batch of {len(commands)} command(s). Output: {output_msg}")
                         continue
+                    log.warning(f"[NetHandler EXEC] Batch not applied ({output_msg}); applying commands one by one.")
 
+                for single_cmd in commands:
                     log.info(f"[NetHandler TCP] Processing command: '{single_cmd}'")
                     # Call the executor from the command_executor module
                     success, output_msg = command_executor.execute_firewall_command(single_cmd)
@@ -3,7 +3,7 @@ from PyQt6.QtWidgets import QApplication # Keep Qt import here or in admin.py
 
 from admin_app.admin import AdminGUI
 
-from backend import admin_connect, policy_engine, service_mapper, alias_manager, nlp
+from backend import admin_connect, service_mapper, alias_manager  # NLP modules are imported by AdminGUI after show()
 import logging
 
 
@@ -14,7 +14,7 @@ if __name__ == "__main__":
                         datefmt='%H:%M:%S')
 
     # Ensure backend modules are available (similar to what was in admin.py's __main__)
-    if not all([admin_connect, policy_engine, service_mapper, nlp, alias_manager]):
+    if not all([admin_connect, service_mapper, alias_manager]):
         logging.critical("Essential backend modules failed to load from main.py. Exiting application.")
         # You might want a QMessageBox here if QApplication is already running or can be started
         sys.exit(1)
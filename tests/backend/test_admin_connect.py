@@ -0,0 +1,162 @@
+# tests/backend/test_admin_connect.py
+
+import unittest
+from unittest import mock
+import queue
+import socket
+import threading
+import time
+import sys
+import os
+
+# Add the project root to the Python path (see test_alias_manager.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend import admin_connect
+
+LOOPBACK = '127.0.0.1'
+TIMEOUT = 3.0  # Seconds to wait for the backend threads to react
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((LOOPBACK, 0))
+        return s.getsockname()[1]
+
+class TestAdminConnectServer(unittest.TestCase):
+    """Runs admin_connect.main() in a thread and talks to it over loopback, like a Pi would."""
+
+    def setUp(self):
+        # Keep discovery broadcasts on loopback and give every test its own TCP port
+        for name, value in (("TCP_PORT", _free_port()), ("BROADCAST_ADDR", LOOPBACK)):
+            patcher = mock.patch.object(admin_connect, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self._drain_events()
+        self.clients = []
+        self.main_thread = None
+        self._start_backend()
+
+    def tearDown(self):
+        self._stop_backend()
+        for client in self.clients:
+            client.close()
+
+    # --- Helpers ---
+    def _start_backend(self):
+        self.main_thread = threading.Thread(target=admin_connect.main, daemon=True)
+        self.main_thread.start()
+
+    def _stop_backend(self) -> float:
+        """Requests a stop and returns how long main() took to return."""
+        started = time.monotonic()
+        admin_connect.request_stop()
+        self.main_thread.join(TIMEOUT)
+        return time.monotonic() - started
+
+    def _connect(self) -> socket.socket:
+        """Connects to the admin's TCP port, retrying until the server thread is listening."""
+        deadline = time.monotonic() + TIMEOUT
+        while True:
+            try:
+                client = socket.create_connection((LOOPBACK, admin_connect.TCP_PORT), timeout=TIMEOUT)
+                self.clients.append(client)
+                return client
+            except ConnectionRefusedError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.02)
+
+    def _next_event(self):
+        return admin_connect.device_events.get(timeout=TIMEOUT)
+
+    def _drain_events(self) -> list:
+        events = []
+        while True:
+            try:
+                events.append(admin_connect.device_events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _recv_exactly(self, client: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    # --- Tests ---
+    def test_connect_publishes_snapshot_and_event(self):
+        """Test that a new connection is announced through device_events and connected_devices_snapshot."""
+        self._connect()
+        self.assertEqual(self._next_event(), (admin_connect.DEVICE_CONNECTED, LOOPBACK))
+        self.assertEqual(admin_connect.connected_devices_snapshot, frozenset({LOOPBACK}))
+
+    def test_send_command_batch_writes_newline_terminated_bytes(self):
+        """Test that a batch reaches the Pi as one newline-terminated line per command."""
+        client = self._connect()
+        self._next_event()
+        admin_connect.send_command_batch(LOOPBACK, ["iptables -A INPUT -j DROP", "iptables -A OUTPUT -j DROP"])
+        expected = b"iptables -A INPUT -j DROP\niptables -A OUTPUT -j DROP\n"
+        self.assertEqual(self._recv_exactly(client, len(expected)), expected)
+
+    def test_send_to_unknown_ip_raises(self):
+        """Test that sending to an IP with no connection raises ConnectionError."""
+        with self.assertRaises(ConnectionError):
+            admin_connect.send_command_batch("10.255.255.1", ["iptables -L"])
+
+    def test_reconnect_survives_old_connection_closing(self):
+        """Test that closing a Pi's old connection doesn't drop its newer one from the same IP."""
+        first = self._connect()
+        self._next_event()
+        second = self._connect()
+        self.assertEqual(self._next_event(), (admin_connect.DEVICE_CONNECTED, LOOPBACK))
+
+        unregistered = threading.Event()
+        real_unregister = admin_connect._unregister_client
+        def _tracking_unregister(*args):
+            real_unregister(*args)
+            unregistered.set()
+        with mock.patch.object(admin_connect, "_unregister_client", _tracking_unregister):
+            first.close()
+            self.assertTrue(unregistered.wait(TIMEOUT), "server never cleaned up the closed connection")
+
+        self.assertEqual(self._drain_events(), [])  # No disconnect for the IP that is still connected
+        self.assertEqual(admin_connect.connected_devices_snapshot, frozenset({LOOPBACK}))
+        admin_connect.send_command_batch(LOOPBACK, ["iptables -L"])
+        self.assertEqual(self._recv_exactly(second, len(b"iptables -L\n")), b"iptables -L\n")
+
+    def test_request_stop_returns_promptly_and_disconnects(self):
+        """Test that request_stop() wakes every backend loop at once and drops connected Pis."""
+        client = self._connect()
+        self._next_event()
+
+        elapsed = self._stop_backend()
+        self.assertFalse(self.main_thread.is_alive())
+        self.assertLess(elapsed, 1.0)  # No loop waits out a polling timeout or broadcast interval
+        self.assertEqual(admin_connect.connected_devices_snapshot, frozenset())
+        self.assertEqual(self._next_event(), (admin_connect.DEVICE_DISCONNECTED, LOOPBACK))
+        self.assertEqual(client.recv(16), b"")  # The server closed its end
+
+    def test_stop_start_cycle(self):
+        """Test that the backend can be restarted after a stop, with the stop wake-up drained."""
+        self._connect()
+        self._next_event()
+        self._stop_backend()
+        self._drain_events()
+
+        self._start_backend()
+        client = self._connect()
+        self.assertEqual(self._next_event(), (admin_connect.DEVICE_CONNECTED, LOOPBACK))
+        self.assertTrue(self.main_thread.is_alive())
+        with self.assertRaises(BlockingIOError):
+            admin_connect._stop_wake_r.recv(1)  # The previous stop's wake-up byte was discarded
+        admin_connect.send_command_batch(LOOPBACK, ["iptables -L"])
+        self.assertEqual(self._recv_exactly(client, len(b"iptables -L\n")), b"iptables -L\n")
+
+if __name__ == '__main__':
+    unittest.main()
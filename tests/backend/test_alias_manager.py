@@ -38,7 +38,7 @@ class TestAliasManager(unittest.TestCase):
         self.assertTrue(alias_manager.add_alias("192.168.1.10", "WebServer1"))
         self.assertEqual(alias_manager.get_ip_for_alias("WebServer1"), "192.168.1.10")
         self.assertEqual(alias_manager.get_ip_for_alias("webserver1"), "192.168.1.10") # Test case-insensitivity
-        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.10"), "webserver1") # Stored as lowercase
+        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.10"), "WebServer1") # Original case kept for display
 
     def test_add_empty_alias_or_ip(self):
         """Test adding empty alias or IP should fail."""
@@ -55,11 +55,11 @@ class TestAliasManager(unittest.TestCase):
         """Test updating an alias for an existing IP."""
         alias_manager.add_alias("192.168.1.20", "OldAlias")
         self.assertEqual(alias_manager.get_ip_for_alias("OldAlias"), "192.168.1.20")
-        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.20"), "oldalias")
+        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.20"), "OldAlias")
 
         self.assertTrue(alias_manager.add_alias("192.168.1.20", "NewAlias")) # Update alias for same IP
         self.assertEqual(alias_manager.get_ip_for_alias("NewAlias"), "192.168.1.20")
-        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.20"), "newalias")
+        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.20"), "NewAlias")
         self.assertIsNone(alias_manager.get_ip_for_alias("OldAlias")) # Old alias should be gone
 
     def test_update_ip_for_alias(self):
@@ -99,13 +99,43 @@ class TestAliasManager(unittest.TestCase):
         self.assertEqual(alias_manager.get_ip_for_alias("mixedcasealias"), "192.168.1.60")
         self.assertEqual(alias_manager.get_ip_for_alias("MixedCaseAlias"), "192.168.1.60")
         self.assertEqual(alias_manager.get_ip_for_alias("MIXEDCASEALIAS"), "192.168.1.60")
-        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.60"), "mixedcasealias")
+        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.60"), "MixedCaseAlias")
 
         # Overwriting with different case should update the same entry
         alias_manager.add_alias("192.168.1.61", "MIXEDCASEALIAS") # This should update "mixedcasealias"
         self.assertEqual(alias_manager.get_ip_for_alias("mixedcasealias"), "192.168.1.61")
-        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.61"), "mixedcasealias")
+        self.assertEqual(alias_manager.get_alias_for_ip("192.168.1.61"), "MIXEDCASEALIAS")
         self.assertIsNone(alias_manager.get_alias_for_ip("192.168.1.60")) # Old IP should no longer map to this alias
 
+    def test_get_all_ip_aliases(self):
+        """Test the reverse (IP to alias) bulk copy."""
+        alias_manager.add_alias("1.1.1.1", "Alias1")
+        alias_manager.add_alias("2.2.2.2", "Alias2")
+        ip_map = alias_manager.get_all_ip_aliases()
+        self.assertEqual(ip_map, {"1.1.1.1": "Alias1", "2.2.2.2": "Alias2"})
+        ip_map["3.3.3.3"] = "alias3" # Mutating the copy must not affect the manager
+        self.assertIsNone(alias_manager.get_alias_for_ip("3.3.3.3"))
+
+    def test_re_adding_same_alias_is_a_no_op(self):
+        """Test that re-asserting an existing mapping succeeds without counting as a change."""
+        alias_manager.add_alias("10.0.0.7", "Camera")
+        v1 = alias_manager.get_version()
+        self.assertTrue(alias_manager.add_alias("10.0.0.7", "Camera"))
+        self.assertEqual(alias_manager.get_version(), v1)
+        self.assertTrue(alias_manager.add_alias("10.0.0.7", "CAMERA")) # New display case is a change
+        self.assertNotEqual(alias_manager.get_version(), v1)
+        self.assertEqual(alias_manager.get_alias_for_ip("10.0.0.7"), "CAMERA")
+
+    def test_version_changes_on_mutation(self):
+        """Test that the version counter moves on add/remove but not on a failed remove."""
+        v0 = alias_manager.get_version()
+        alias_manager.add_alias("10.0.0.1", "Router")
+        v1 = alias_manager.get_version()
+        self.assertNotEqual(v0, v1)
+        alias_manager.remove_alias_for_ip("10.0.0.2") # No alias for this IP
+        self.assertEqual(alias_manager.get_version(), v1)
+        alias_manager.remove_alias_for_ip("10.0.0.1")
+        self.assertNotEqual(alias_manager.get_version(), v1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
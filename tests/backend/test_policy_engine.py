@@ -0,0 +1,66 @@
+# tests/backend/test_policy_engine.py
+
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add the project root to the Python path (see test_alias_manager.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend import alias_manager
+from backend import policy_engine
+
+class TestPolicyEngineParseCache(unittest.TestCase):
+
+    def setUp(self):
+        """Start every test with an empty parse cache and no aliases; replace the NLP engine with a mock."""
+        policy_engine._cached_parse.cache_clear()
+        alias_manager._aliases_to_ip.clear()
+        alias_manager._ip_to_aliases.clear()
+
+        self.engine = mock.Mock()
+        self.engine.parse_and_generate_commands.return_value = [
+            ("10.0.0.1", None, "10.0.0.2", ["iptables -A INPUT -d 10.0.0.2 -j DROP"])
+        ]
+        patcher = mock.patch.object(policy_engine, "get_policy_engine_instance", return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeated_parse_is_cache_hit(self):
+        """Test that parsing the same text and target twice runs the engine once."""
+        first = policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        second = policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+
+        self.assertEqual(first, second)
+        self.engine.parse_and_generate_commands.assert_called_once_with("deny all to 10.0.0.2", "10.0.0.1")
+        self.assertEqual(policy_engine._cached_parse.cache_info().hits, 1)
+
+    def test_different_preferred_target_is_cache_miss(self):
+        """Test that the preferred target is part of the cache key."""
+        policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.3")
+        self.assertEqual(self.engine.parse_and_generate_commands.call_count, 2)
+
+    def test_alias_change_is_cache_miss(self):
+        """Test that an alias edit (which bumps alias_manager.get_version()) invalidates cached parses."""
+        policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        version_before = alias_manager.get_version()
+        alias_manager.add_alias("10.0.0.2", "Printer")
+        self.assertNotEqual(alias_manager.get_version(), version_before)
+
+        policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        self.assertEqual(self.engine.parse_and_generate_commands.call_count, 2)
+
+    def test_cached_result_is_not_shared_with_callers(self):
+        """Test that mutating a returned command list doesn't change what the next call returns."""
+        first = policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        first[0][3].append("iptables -F")
+        second = policy_engine.parse_and_generate_commands_for_gui("deny all to 10.0.0.2", "10.0.0.1")
+        self.assertEqual(second[0][3], ["iptables -A INPUT -d 10.0.0.2 -j DROP"])
+
+if __name__ == '__main__':
+    unittest.main()
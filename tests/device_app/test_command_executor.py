@@ -0,0 +1,97 @@
+# tests/device_app/test_command_executor.py
+
+import unittest
+from unittest import mock
+import subprocess
+import sys
+import os
+
+# Add the project root to the Python path (see tests/backend/test_alias_manager.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from device_app import command_executor
+
+class TestExecuteFirewallBatch(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(command_executor.subprocess, "run")
+        self.mock_run = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr="")
+
+    def test_payload_is_single_filter_commit(self):
+        """Test that eligible rules are sent to one iptables-restore run as a *filter ... COMMIT payload."""
+        success, msg = command_executor.execute_firewall_batch([
+            "iptables -A INPUT -s 10.0.0.5 -j DROP",
+            "iptables -I FORWARD 1 -d 10.0.0.6 -j ACCEPT",
+            "iptables -D INPUT -s 10.0.0.7 -j DROP",
+        ])
+        self.assertTrue(success, msg)
+        self.mock_run.assert_called_once()
+        args, kwargs = self.mock_run.call_args
+        self.assertEqual(args[0], ['sudo', '-n', command_executor.IPTABLES_RESTORE_PATH, '--noflush'])
+        self.assertEqual(kwargs["input"],
+                         "*filter\n"
+                         "-A INPUT -s 10.0.0.5 -j DROP\n"
+                         "-I FORWARD 1 -d 10.0.0.6 -j ACCEPT\n"
+                         "-D INPUT -s 10.0.0.7 -j DROP\n"
+                         "COMMIT\n")
+
+    def test_sudo_never_prompts(self):
+        """Test that sudo runs non-interactively, so a missing sudoers entry fails fast instead of blocking."""
+        command_executor.execute_firewall_batch(["iptables -A INPUT -j DROP"])
+        argv = self.mock_run.call_args[0][0]
+        self.assertEqual(argv[0], 'sudo')
+        self.assertIn('-n', argv[:argv.index(command_executor.IPTABLES_RESTORE_PATH)])
+
+    def test_ineligible_prefix_is_rejected(self):
+        """Test that non -A/-I/-D commands (flush, policy, new chain) are not batched."""
+        for command in ("iptables -F", "iptables -P INPUT DROP", "iptables -N MYCHAIN"):
+            with self.subTest(command=command):
+                success, _ = command_executor.execute_firewall_batch(["iptables -A INPUT -j DROP", command])
+                self.assertFalse(success)
+        self.mock_run.assert_not_called()
+
+    def test_table_flags_are_rejected(self):
+        """Test that every spelling of a table selection keeps the batch out of the *filter section."""
+        for rule in ("-A PREROUTING -t nat -j DNAT --to-destination 10.0.0.1",
+                     "-A PREROUTING -tnat -j DNAT --to-destination 10.0.0.1",
+                     "-A PREROUTING --table nat -j DNAT --to-destination 10.0.0.1",
+                     "-A PREROUTING --table=nat -j DNAT --to-destination 10.0.0.1",
+                     "-A PREROUTING --tab nat -j DNAT --to-destination 10.0.0.1"):
+            with self.subTest(rule=rule):
+                success, _ = command_executor.execute_firewall_batch([f"iptables {rule}"])
+                self.assertFalse(success)
+        self.mock_run.assert_not_called()
+
+    def test_long_options_starting_with_t_are_allowed(self):
+        """Test that options like --to-destination aren't mistaken for a table flag."""
+        success, msg = command_executor.execute_firewall_batch(["iptables -A FORWARD -p tcp --tcp-flags SYN SYN -j DROP"])
+        self.assertTrue(success, msg)
+        self.mock_run.assert_called_once()
+
+    def test_invalid_command_is_rejected(self):
+        """Test that a command failing validation rejects the whole batch."""
+        success, _ = command_executor.execute_firewall_batch(["iptables -A INPUT -j DROP", "rm -rf /"])
+        self.assertFalse(success)
+        self.mock_run.assert_not_called()
+
+    def test_restore_failure_is_reported(self):
+        """Test that a non-zero iptables-restore exit is returned as a failure with stderr."""
+        self.mock_run.return_value = subprocess.CompletedProcess(args=[], returncode=1, stdout="",
+                                                                 stderr="line 2 failed")
+        success, msg = command_executor.execute_firewall_batch(["iptables -A INPUT -j DROP"])
+        self.assertFalse(success)
+        self.assertIn("line 2 failed", msg)
+
+    def test_restore_timeout_is_reported(self):
+        """Test that a timed out iptables-restore is returned as a failure."""
+        self.mock_run.side_effect = subprocess.TimeoutExpired(cmd="iptables-restore", timeout=15)
+        success, _ = command_executor.execute_firewall_batch(["iptables -A INPUT -j DROP"])
+        self.assertFalse(success)
+
+if __name__ == '__main__':
+    unittest.main()
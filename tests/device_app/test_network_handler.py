@@ -0,0 +1,62 @@
+# tests/device_app/test_network_handler.py
+
+import unittest
+from unittest import mock
+import socket
+import threading
+import sys
+import os
+
+# Add the project root to the Python path (see tests/backend/test_alias_manager.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from device_app import network_handler
+
+class TestMonitorConnection(unittest.TestCase):
+
+    def setUp(self):
+        batch_patcher = mock.patch.object(network_handler.command_executor, "execute_firewall_batch")
+        single_patcher = mock.patch.object(network_handler.command_executor, "execute_firewall_command",
+                                           return_value=(True, "ok"))
+        self.mock_batch = batch_patcher.start()
+        self.mock_single = single_patcher.start()
+        self.addCleanup(batch_patcher.stop)
+        self.addCleanup(single_patcher.stop)
+
+    def _run_monitor(self, payload: bytes):
+        """Sends payload from the admin side, closes it, and runs monitor_connection until it sees the disconnect."""
+        device_sock, admin_sock = socket.socketpair()
+        try:
+            admin_sock.sendall(payload)
+            admin_sock.close()
+            network_handler.monitor_connection(device_sock, threading.Event())
+        finally:
+            device_sock.close()
+
+    def test_batch_success_skips_per_command(self):
+        """Test that a multi-command message applied by iptables-restore isn't executed again one by one."""
+        self.mock_batch.return_value = (True, "Applied 2 rule(s)")
+        self._run_monitor(b"iptables -A INPUT -j DROP\niptables -A OUTPUT -j DROP\n")
+        self.mock_batch.assert_called_once_with(["iptables -A INPUT -j DROP", "iptables -A OUTPUT -j DROP"])
+        self.mock_single.assert_not_called()
+
+    def test_batch_failure_falls_back_to_per_command(self):
+        """Test that a rejected batch is applied with one execute_firewall_command call per command, in order."""
+        self.mock_batch.return_value = (False, "Command not eligible for iptables-restore")
+        self._run_monitor(b"iptables -A INPUT -j DROP\niptables -t nat -A PREROUTING -j ACCEPT\n")
+        self.mock_batch.assert_called_once()
+        self.assertEqual(self.mock_single.call_args_list,
+                         [mock.call("iptables -A INPUT -j DROP"),
+                          mock.call("iptables -t nat -A PREROUTING -j ACCEPT")])
+
+    def test_single_command_is_not_batched(self):
+        """Test that a lone command goes straight to execute_firewall_command."""
+        self._run_monitor(b"iptables -A INPUT -j DROP\n")
+        self.mock_batch.assert_not_called()
+        self.mock_single.assert_called_once_with("iptables -A INPUT -j DROP")
+
+if __name__ == '__main__':
+    unittest.main()